@@ -0,0 +1,80 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class Overloaded(Exception):
+    def __init__(self, budget, reason, retry_after):
+        super().__init__(f"{budget} budget {reason}")
+        self.budget = budget
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Limiter:
+    def __init__(self, name, limit, queue_size=0, timeout=1.0):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._active = 0
+        self._admitted = 0
+        self._queued = 0
+        self._wait_total = 0.0
+        self._rejected = {'queue_full': 0, 'deadline': 0}
+        self._hold = 0.0
+
+    def retry_after(self):
+        return max(1, math.ceil(self._hold * (len(self._waiters) + 1) / self.limit))
+
+    def _reject(self, reason):
+        self._rejected[reason] += 1
+        return Overloaded(self.name, reason, self.retry_after())
+
+    def acquire(self):
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self._admitted += 1
+                return time.perf_counter()
+            if len(self._waiters) >= self.queue_size:
+                raise self._reject('queue_full')
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self._queued += 1
+        start = time.perf_counter()
+        admitted = waiter.wait(self.timeout)
+        with self._lock:
+            waited = time.perf_counter() - start
+            self._wait_total += waited
+            if not admitted and not waiter.is_set():
+                self._waiters.remove(waiter)
+                raise self._reject('deadline')
+            self._admitted += 1
+        return start + waited
+
+    def release(self, admitted_at):
+        with self._lock:
+            self._hold = 0.9 * self._hold + 0.1 * (time.perf_counter() - admitted_at)
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'queue_size': self.queue_size,
+                'timeout_ms': self.timeout * 1000,
+                'active': self._active,
+                'queued': len(self._waiters),
+                'admitted': self._admitted,
+                'waited': self._queued,
+                'wait_total_ms': round(self._wait_total * 1000, 3),
+                'rejected': dict(self._rejected),
+                'hold_avg_ms': round(self._hold * 1000, 3),
+            }
@@ -1,92 +1,1054 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS, cross_origin
+import base64
+import binascii
+import concurrent.futures
+import csv
+import hashlib
+import io
+import json
+import pickle
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from admission import Limiter, Overloaded
+from cache import ResultCache
+from compression import choose_encoding, compress, compress_chunks
+from db import ConnectionPool, PoolTimeout
+from metrics import SIZE_BUCKETS, Registry
+from migrate import latest_version, schema_version
+from similar import FEATURES, SimilarityIndex, feature_columns
+from stats import DIMENSIONS, rebuild_stats
+from suggest import SuggestIndex
+from transfer import DEFAULT_VALUES, FORMATS, TABLES, export_query, fits_integer, load_chunks, pending_imports, read_records, validate_chunks, validate_value
+from writer import Rollback, WriteQueue
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'Link', 'ETag', 'Last-Modified', 'Retry-After'])
 app.config['CORS_HEADERS'] = 'Content-Type'
+app.config['DB_READ_POOL_SIZE'] = 8
+app.config['DB_POOL_TIMEOUT'] = 30.0
+app.config['DEFAULT_PAGE_SIZE'] = 100
+app.config['MAX_PAGE_SIZE'] = 1000
+app.config['STREAM_MAX_PAGE_SIZE'] = 100000
+app.config['STREAM_CHUNK_SIZE'] = 500
+app.config['BATCH_CHUNK_SIZE'] = 1000
+app.config['IMPORT_CHUNK_SIZE'] = 5000
+app.config['IMPORT_SPOOL_SIZE'] = 16 * 1024 * 1024
+app.config['IMPORT_DEFER_MIN_ROWS'] = 100000
+app.config['WRITE_BATCH_SIZE'] = 64
+app.config['WRITE_BATCH_LATENCY'] = 0.002
+app.config['SUGGEST_LIMIT'] = 10
+app.config['SUGGEST_MAX_LIMIT'] = 50
+app.config['SIMILAR_K'] = 20
+app.config['SIMILAR_MAX_K'] = 500
+app.config['RESULT_CACHE_SIZE'] = 1024
+app.config['RESULT_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+app.config['RESULT_CACHE_TTL'] = None
+app.config['ADMISSION_READ_LIMIT'] = 16
+app.config['ADMISSION_READ_QUEUE'] = 64
+app.config['ADMISSION_WRITE_LIMIT'] = 8
+app.config['ADMISSION_WRITE_QUEUE'] = 32
+app.config['ADMISSION_TIMEOUT'] = 2.0
+app.config['ADMISSION_EXEMPT'] = {'get_metrics', 'get_slow_queries', 'get_pool_stats', 'get_cache_stats', 'get_admission_stats'}
+app.config['SLOW_QUERY_MS'] = 100
+app.config['SLOW_QUERY_LOG_SIZE'] = 100
+app.config['COMPRESSION_MIN_SIZE'] = 1024
+app.config['COMPRESSION_GZIP_LEVEL'] = 6
+app.config['COMPRESSION_ZSTD_LEVEL'] = 3
+app.config['COMPRESSION_MIMETYPES'] = {
+    'application/json',
+    'application/vnd.sdrestful.columnar+json',
+    'application/msgpack',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+}
 DATABASE = 'database.db'
 
-def get_db():
-    db = sqlite3.connect(DATABASE)
-    db.row_factory = sqlite3.Row
-    return db
+_components = {}
+_components_lock = threading.Lock()
+
+def get_component(name, factory):
+    component = _components.get(name)
+    if component is None:
+        with _components_lock:
+            component = _components.get(name)
+            if component is None:
+                component = _components[name] = factory()
+    return component
+
+def get_limiters():
+    return get_component('limiters', lambda: {
+        'read': Limiter('read', app.config['ADMISSION_READ_LIMIT'], app.config['ADMISSION_READ_QUEUE'], app.config['ADMISSION_TIMEOUT']),
+        'write': Limiter('write', app.config['ADMISSION_WRITE_LIMIT'], app.config['ADMISSION_WRITE_QUEUE'], app.config['ADMISSION_TIMEOUT']),
+    })
+
+def get_slow_query_log():
+    return get_component('slow_queries', lambda: deque(maxlen=app.config['SLOW_QUERY_LOG_SIZE']))
+
+def get_result_cache():
+    return get_component('result_cache', lambda: ResultCache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_MAX_BYTES'], app.config['RESULT_CACHE_TTL']))
+
+registry = Registry()
+REQUEST_DURATION = registry.histogram('http_request_duration_seconds', "Time spent handling a request, until the last byte of streamed bodies", ('endpoint', 'method'))
+REQUESTS = registry.counter('http_requests_total', "Requests handled", ('endpoint', 'method', 'status'))
+REQUEST_ERRORS = registry.counter('http_request_errors_total', "Requests answered with a 5xx status", ('endpoint',))
+RESPONSE_BYTES = registry.histogram('http_response_bytes', "Size of response bodies", ('endpoint',), SIZE_BUCKETS)
+ROWS_RETURNED = registry.histogram('db_rows_returned', "Rows returned by list queries", ('endpoint',), SIZE_BUCKETS)
+SERIALIZE_DURATION = registry.histogram('serialize_duration_seconds', "Time spent encoding rows into the response format", ('endpoint',))
+SQL_DURATION = registry.histogram('sql_statement_duration_seconds', "Time spent executing statements through get_db()", ('endpoint', 'statement'))
+SQL_ERRORS = registry.counter('sql_statement_errors_total', "Statements that raised an error", ('endpoint', 'statement'))
+SLOW_QUERIES = registry.counter('sql_slow_queries_total', "Statements slower than SLOW_QUERY_MS", ('endpoint', 'statement'))
+POOL_CONNECTIONS = registry.gauge('db_pool_connections', "Pooled connections by state", ('pool', 'state'))
+POOL_WAITS = registry.collected_counter('db_pool_waits_total', "Acquisitions that had to wait for a connection", ('pool',))
+POOL_WAIT_SECONDS = registry.collected_counter('db_pool_wait_seconds_total', "Total time spent waiting for a connection", ('pool',))
+POOL_TIMEOUTS = registry.collected_counter('db_pool_timeouts_total', "Acquisitions that timed out", ('pool',))
+CACHE_EVENTS = registry.collected_counter('result_cache_events_total', "Result cache lookups and removals by kind", ('event',))
+CACHE_SIZE = registry.gauge('result_cache_size', "Result cache occupancy", ('unit',))
+WRITE_QUEUE_DEPTH = registry.gauge('db_write_queue_depth', "Write jobs waiting for the writer thread")
+WRITE_QUEUE_JOBS = registry.collected_counter('db_write_queue_jobs_total', "Write jobs completed by the writer thread", ('outcome',))
+WRITE_QUEUE_BATCHES = registry.collected_counter('db_write_queue_batches_total', "Transactions committed by the writer thread")
+ADMISSION_ACTIVE = registry.gauge('admission_active_requests', "Requests holding an admission slot", ('budget',))
+ADMISSION_QUEUE_DEPTH = registry.gauge('admission_queue_depth', "Requests waiting for an admission slot", ('budget',))
+ADMISSION_ADMITTED = registry.collected_counter('admission_admitted_total', "Requests admitted, directly or after waiting", ('budget',))
+ADMISSION_WAIT_SECONDS = registry.collected_counter('admission_wait_seconds_total', "Total time requests spent waiting for a slot", ('budget',))
+ADMISSION_REJECTIONS = registry.collected_counter('admission_rejections_total', "Requests answered with 503 by admission control", ('budget', 'reason'))
+
+_context = threading.local()
+
+def current_endpoint():
+    return getattr(_context, 'endpoint', None) or 'unknown'
+
+def observe_statement(conn, sql, parameters, seconds, failed):
+    endpoint = current_endpoint()
+    words = sql.split(None, 1)
+    statement = words[0].upper() if words else ''
+    SQL_DURATION.observe(endpoint, statement, value=seconds)
+    if failed:
+        SQL_ERRORS.inc(endpoint, statement)
+    if seconds * 1000 < app.config['SLOW_QUERY_MS'] or statement in ('PRAGMA', 'EXPLAIN'):
+        return
+    SLOW_QUERIES.inc(endpoint, statement)
+    try:
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+    except (sqlite3.Error, ValueError):
+        plan = None
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'endpoint': endpoint,
+        'ms': round(seconds * 1000, 3),
+        'sql': ' '.join(sql.split()),
+        'parameters': len(parameters) if hasattr(parameters, '__len__') else None,
+        'plan': plan,
+    }
+    get_slow_query_log().append(entry)
+    app.logger.warning("Slow query (%.1f ms) in %s: %s [%s parameters] plan=%s", entry['ms'], endpoint, entry['sql'], entry['parameters'], plan)
+
+def collect_stats():
+    for name, pool in _pools.items():
+        stats = pool.stats()
+        POOL_CONNECTIONS.set(name, 'open', value=stats['open'])
+        POOL_CONNECTIONS.set(name, 'in_use', value=stats['in_use'])
+        POOL_WAITS.set(name, value=stats['waits'])
+        POOL_WAIT_SECONDS.set(name, value=stats['wait_total_ms'] / 1000)
+        POOL_TIMEOUTS.set(name, value=stats['timeouts'])
+    stats = get_result_cache().stats()
+    for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+        CACHE_EVENTS.set(event, value=stats[event])
+    CACHE_SIZE.set('entries', value=stats['entries'])
+    CACHE_SIZE.set('bytes', value=stats['bytes'])
+    if _write_queue:
+        stats = _write_queue['queue'].stats()
+        WRITE_QUEUE_DEPTH.set(value=stats['queued'])
+        WRITE_QUEUE_JOBS.set('ok', value=stats['jobs'] - stats['failed'])
+        WRITE_QUEUE_JOBS.set('failed', value=stats['failed'])
+        WRITE_QUEUE_BATCHES.set(value=stats['batches'])
+    for name, limiter in _components.get('limiters', {}).items():
+        stats = limiter.stats()
+        ADMISSION_ACTIVE.set(name, value=stats['active'])
+        ADMISSION_QUEUE_DEPTH.set(name, value=stats['queued'])
+        ADMISSION_ADMITTED.set(name, value=stats['admitted'])
+        ADMISSION_WAIT_SECONDS.set(name, value=stats['wait_total_ms'] / 1000)
+        for reason, count in stats['rejected'].items():
+            ADMISSION_REJECTIONS.set(name, reason, value=count)
+
+registry.add_collector(collect_stats)
+
+_pools = {}
+_pools_lock = threading.Lock()
+_write_queue = {}
+
+def get_pools():
+    if not _pools:
+        with _pools_lock:
+            if not _pools:
+                writer = ConnectionPool(DATABASE, size=1, timeout=app.config['DB_POOL_TIMEOUT'], observer=observe_statement)
+                with writer.acquire() as conn:
+                    version = schema_version(conn)
+                    unfinished = pending_imports(conn) if version >= latest_version() else []
+                if version < latest_version():
+                    raise RuntimeError(f"Database schema is at version {version}, expected {latest_version()}; run python init_db.py")
+                if unfinished:
+                    raise RuntimeError(f"Import of {unfinished[0]} did not finish; run python transfer.py import to resume it")
+                _pools['writer'] = writer
+                _write_queue['queue'] = WriteQueue(writer, app.config['WRITE_BATCH_SIZE'], app.config['WRITE_BATCH_LATENCY'])
+                _pools['reader'] = ConnectionPool(DATABASE, size=app.config['DB_READ_POOL_SIZE'], timeout=app.config['DB_POOL_TIMEOUT'], readonly=True, observer=observe_statement)
+    return _pools
+
+def get_db(readonly=False):
+    return get_pools()['reader' if readonly else 'writer'].acquire()
+
+def get_write_queue():
+    get_pools()
+    return _write_queue['queue']
+
+def write(func):
+    endpoint = current_endpoint()
+
+    def job(conn):
+        _context.endpoint = endpoint
+        return func(conn)
+
+    future = get_write_queue().submit(job)
+    try:
+        return future.result(timeout=app.config['DB_POOL_TIMEOUT'])
+    except concurrent.futures.TimeoutError:
+        if future.cancel():
+            raise PoolTimeout("Write queue is busy")
+        return future.result()
+
+def warm_pools():
+    for pool in get_pools().values():
+        connections = []
+        try:
+            for _ in range(pool.size):
+                connections.append(pool.acquire())
+                connections[-1].execute("SELECT name, version FROM table_version").fetchall()
+        finally:
+            for conn in connections:
+                conn.close()
+    get_write_queue().start()
+    refresh_index(suggest_index, suggest_rows)
+    if similarity_index is not None:
+        refresh_index(similarity_index, similar_rows)
+
+def close_pools():
+    with _pools_lock:
+        if _write_queue:
+            _write_queue.pop('queue').close()
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
+
+class InvalidParameter(Exception):
+    pass
+
+@app.errorhandler(InvalidParameter)
+def handle_invalid_parameter(error):
+    return jsonify({"message": str(error)}), 400
+
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(error):
+    return jsonify({"message": "Database is busy, try again later"}), 503
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(error):
+    response = jsonify({"message": "Server is overloaded, try again later", "budget": error.budget, "reason": error.reason})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def finish_request(endpoint, method, status, start, size):
+    REQUEST_DURATION.observe(endpoint, method, value=time.perf_counter() - start)
+    REQUESTS.inc(endpoint, method, str(status))
+    RESPONSE_BYTES.observe(endpoint, value=size)
+    if status >= 500:
+        REQUEST_ERRORS.inc(endpoint)
+
+def measure_stream(body, endpoint, method, status, start):
+    size = 0
+    _context.endpoint = endpoint
+    try:
+        for chunk in body:
+            size += len(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+        finish_request(endpoint, method, status, start, size)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    _context.endpoint = request.endpoint
+
+@app.before_request
+def admit_request():
+    if request.method == 'OPTIONS' or request.endpoint in app.config['ADMISSION_EXEMPT']:
+        return
+    limiter = get_limiters()['read' if request.method in ('GET', 'HEAD') else 'write']
+    g.admission = (limiter, limiter.acquire())
+
+def release_admission(admission):
+    if admission is not None:
+        limiter, admitted_at = admission
+        limiter.release(admitted_at)
+
+@app.teardown_request
+def end_admission(error=None):
+    release_admission(g.pop('admission', None))
+
+def compression_level(encoding):
+    return app.config[f'COMPRESSION_{encoding.upper()}_LEVEL']
+
+def compress_body(body):
+    encoding = choose_encoding(request.accept_encodings) if len(body) >= app.config['COMPRESSION_MIN_SIZE'] else None
+    if not encoding:
+        return body, None
+    return compress(body, encoding, compression_level(encoding)), encoding
+
+def compress_response(response):
+    if response.mimetype not in app.config['COMPRESSION_MIMETYPES']:
+        return response
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers or response.status_code in (204, 304):
+        return response
+    if response.is_streamed:
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding:
+            response.response = compress_chunks(response.response, encoding, compression_level(encoding))
+            response.headers.pop('Content-Length', None)
+    else:
+        body, encoding = compress_body(response.get_data())
+        if encoding:
+            response.set_data(body)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.after_request
+def record_request(response):
+    response = compress_response(response)
+    endpoint = request.endpoint or 'unknown'
+    start = g.get('request_start', time.perf_counter())
+    if response.is_streamed:
+        response.response = measure_stream(response.response, endpoint, request.method, response.status_code, start)
+        admission = g.pop('admission', None)
+        if admission is not None:
+            response.call_on_close(lambda: release_admission(admission))
+    else:
+        finish_request(endpoint, request.method, response.status_code, start, response.content_length or 0)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/slow-queries', methods=['GET'])
+def get_slow_queries():
+    return jsonify(list(get_slow_query_log()))
+
+@app.route('/db/pool', methods=['GET'])
+def get_pool_stats():
+    stats = {name: pool.stats() for name, pool in get_pools().items()}
+    stats['write_queue'] = get_write_queue().stats()
+    return jsonify(stats)
+
+@app.route('/cache', methods=['GET'])
+def get_cache_stats():
+    return jsonify(get_result_cache().stats())
+
+@app.route('/admission', methods=['GET'])
+def get_admission_stats():
+    return jsonify({name: limiter.stats() for name, limiter in get_limiters().items()})
+
+SEARCH_FIELDS = {
+    'folder': ('title', 'theme', 'slogan'),
+    'artist': ('name', 'pseudonym'),
+    'song': ('title', 'genre'),
+}
 
-def build_where_clause(params):
+RANGE_COLUMNS = {
+    'folder': ('number',),
+    'artist': ('id',),
+    'song': ('id', 'bpm', 'length', 'diffN', 'diffH', 'diffA', 'diffL'),
+}
+
+RANGE_OPERATORS = {
+    'min': '>=',
+    'gte': '>=',
+    'gt': '>',
+    'max': '<=',
+    'lte': '<=',
+    'lt': '<',
+}
+
+def parse_number(name, value):
+    if value.lower() in ('true', 'false'):
+        return int(value.lower() == 'true')
+    try:
+        number = int(value)
+    except ValueError:
+        pass
+    else:
+        if not fits_integer(number):
+            raise InvalidParameter(f"{name} is out of range")
+        return number
+    try:
+        return float(value)
+    except ValueError:
+        raise InvalidParameter(f"{name} must be a number")
+
+def build_where_clause(params, table):
     clauses = []
     values = []
     for column, value in params.items():
-        if value:
-            clauses.append(f"{column} LIKE ?")
-            values.append(f"%{value}%")
+        if not value:
+            continue
+        number = parse_number(column, value)
+        if table == 'song' and column == 'bpm':
+            clauses.append("song.bpm_min <= ? AND song.bpm_max >= ?")
+            values += [number, number]
+        else:
+            clauses.append(f"{table}.{column} = ?")
+            values.append(number)
+
+    for column in RANGE_COLUMNS[table]:
+        for suffix, operator in RANGE_OPERATORS.items():
+            name = f"{column}_{suffix}"
+            value = request.args.get(name)
+            if not value:
+                continue
+            if table == 'song' and column == 'bpm':
+                target = 'song.bpm_min' if operator.startswith('>') else 'song.bpm_max'
+            else:
+                target = f"{table}.{column}"
+            clauses.append(f"{target} {operator} ?")
+            values.append(parse_number(name, value))
     return ' AND '.join(clauses), values
 
-@app.route('/folders', methods=['GET'])
-def get_folders():
-    params = {
-        'number': request.args.get('number'),
-        'title': request.args.get('title'),
-        'theme': request.args.get('theme'),
-        'slogan': request.args.get('slogan')
-    }
-    where_clause, values = build_where_clause(params)
+def fts_phrase(value):
+    return '"' + value.replace('"', '""') + '"'
 
-    query = "SELECT * FROM folder"
-    if where_clause:
-        query += f" WHERE {where_clause}"
+def add_search(query, params):
+    table = query.table
+    fields = SEARCH_FIELDS[table]
+    fts = f"{table}_fts"
+    terms = []
+    for field in fields:
+        value = params.pop(field, None)
+        if value and len(value) >= 3:
+            terms.append(f"{field} : {fts_phrase(value)}")
+        elif value:
+            query.where(f"{table}.{field} LIKE ?", [f"%{value}%"])
 
-    conn = get_db()
-    folders = conn.execute(query, values).fetchall()
-    conn.close()
+    q = request.args.get('q', '')
+    for word in q.split():
+        if len(word) >= 3:
+            terms.append(fts_phrase(word))
+        else:
+            query.where('(' + ' OR '.join(f"{table}.{field} LIKE ?" for field in fields) + ')', [f"%{word}%"] * len(fields))
 
-    return jsonify([dict(folder) for folder in folders])
+    if not terms:
+        return
+    if q.strip():
+        query.joins.append(f"JOIN {fts} ON {fts}.rowid = {table}.{query.key}")
+        query.where(f"{fts} MATCH ?", [' AND '.join(terms)])
+        query.rank = f"{fts}.rank"
+    else:
+        query.where(f"{table}.{query.key} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", [' AND '.join(terms)])
 
-@app.route('/artists', methods=['GET'])
-def get_artists():
-    params = {
-        'id': request.args.get('id'),
-        'name': request.args.get('name'),
-        'pseudonym': request.args.get('pseudonym')
-    }
-    where_clause, values = build_where_clause(params)
+TABLE_COLUMNS = {
+    'folder': ('number', 'title', 'theme', 'slogan'),
+    'artist': ('id', 'name', 'pseudonym'),
+    'song': ('id', 'title', 'bpm', 'bpm_min', 'bpm_max', 'length', 'genre', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL'),
+}
+
+RELATIONS = {
+    'song': {
+        'artist': ('artist', 'id'),
+        'folder': ('folder', 'number'),
+    },
+}
+
+def split_list(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+def add_projection(query, fields=(), expand=()):
+    table = query.table
+    relations = RELATIONS.get(table, {})
+    expand = list(expand)
+    for relation in expand:
+        if relation not in relations:
+            raise InvalidParameter(f"Cannot expand {relation}")
+    for field in fields:
+        relation, _, column = field.rpartition('.')
+        if relation:
+            if relation not in relations or column not in TABLE_COLUMNS[relations[relation][0]]:
+                raise InvalidParameter(f"Unknown field {field}")
+            if relation not in expand:
+                expand.append(relation)
+        elif field not in TABLE_COLUMNS[table]:
+            raise InvalidParameter(f"Unknown field {field}")
+    if not fields and not expand:
+        return
+
+    base = [field for field in fields if '.' not in field] if fields else list(TABLE_COLUMNS[table])
+    if query.key not in base:
+        base.insert(0, query.key)
+    selected = [f'{table}.{column} AS "{column}"' for column in base if column not in expand]
+    for relation in expand:
+        target, target_key = relations[relation]
+        columns = [field.split('.', 1)[1] for field in fields if field.startswith(f"{relation}.")] or list(TABLE_COLUMNS[target])
+        if target_key not in columns:
+            columns.insert(0, target_key)
+        selected += [f'{relation}.{column} AS "{relation}.{column}"' for column in columns]
+        query.joins.append(f"LEFT JOIN {target} AS {relation} ON {relation}.{target_key} = {table}.{relation}")
+        query.tables.add(target)
+    query.columns = ', '.join(selected)
+    query.expanded = tuple(expand)
+
+def encode_cursor(keys):
+    return base64.urlsafe_b64encode(json.dumps(keys).encode()).rstrip(b'=').decode()
+
+def decode_cursor(cursor, size):
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidParameter("Invalid cursor")
+    if not isinstance(keys, list) or len(keys) != size or not isinstance(keys[-1], int) \
+            or not all(isinstance(key, float) or (isinstance(key, int) and fits_integer(key)) for key in keys):
+        raise InvalidParameter("Invalid cursor")
+    return keys
+
+class ListQuery:
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+        self.tables = {table}
+        self.joins = []
+        self.clauses = []
+        self.values = []
+        self.rank = None
+        self.columns = None
+        self.expanded = ()
+
+    def where(self, clause, values=()):
+        if clause:
+            self.clauses.append(clause)
+            self.values.extend(values)
+
+    def cursor_columns(self):
+        columns = f"{self.table}.{self.key}"
+        return f"{columns}, {self.rank} AS rank" if self.rank else columns
+
+    def cursor(self, row):
+        return encode_cursor([row['rank'], row[self.key]] if self.rank else [row[self.key]])
 
-    query = "SELECT * FROM artist"
-    if where_clause:
-        query += f" WHERE {where_clause}"
+    def decode_after(self, after):
+        return decode_cursor(after, 2 if self.rank else 1) if after else None
 
-    conn = get_db()
-    artists = conn.execute(query, values).fetchall()
-    conn.close()
+    def to_dict(self, row):
+        data = dict(row)
+        for relation in self.expanded:
+            prefix = f"{relation}."
+            nested = {name[len(prefix):]: data.pop(name) for name in row.keys() if name.startswith(prefix)}
+            data[relation] = nested if nested[RELATIONS[self.table][relation][1]] is not None else None
+        return data
 
-    return jsonify([dict(artist) for artist in artists])
+    def sql(self, columns=None, after=None):
+        key = f"{self.table}.{self.key}"
+        if columns is None:
+            columns = self.columns or f"{self.table}.*"
+            if self.rank:
+                columns += f", {self.rank} AS rank"
+        clauses = list(self.clauses)
+        values = list(self.values)
+        if after and self.rank:
+            clauses.append(f"({self.rank} > ? OR ({self.rank} = ? AND {key} > ?))")
+            values += [after[0], after[0], after[1]]
+        elif after:
+            clauses.append(f"{key} > ?")
+            values.append(after[0])
+
+        query = f"SELECT {columns} FROM {self.table}"
+        for join in self.joins:
+            query += f" {join}"
+        if clauses:
+            query += f" WHERE {' AND '.join(clauses)}"
+        query += f" ORDER BY {self.rank}, {key}" if self.rank else f" ORDER BY {key}"
+        return query, values
+
+def get_page_limit(stream=False):
+    maximum = app.config['STREAM_MAX_PAGE_SIZE' if stream else 'MAX_PAGE_SIZE']
+    limit = request.args.get('limit')
+    if not limit:
+        return maximum if stream else app.config['DEFAULT_PAGE_SIZE']
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise InvalidParameter("limit must be an integer")
+    if limit < 1:
+        raise InvalidParameter("limit must be positive")
+    return min(limit, maximum)
+
+def fetch_page(query, after, limit):
+    sql, values = query.sql(after=after)
+    with get_db(readonly=True) as conn:
+        cursor = conn.execute(f"{sql} LIMIT ?", values + [limit + 1])
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = query.cursor(rows[-1])
+    return rows, columns, next_cursor
+
+def probe_next_cursor(conn, query, after, limit):
+    sql, values = query.sql(columns=query.cursor_columns(), after=after)
+    keys = conn.execute(f"{sql} LIMIT 2 OFFSET ?", values + [limit - 1]).fetchall()
+    return query.cursor(keys[0]) if len(keys) == 2 else None
+
+LIST_FORMATS = {
+    'json': 'application/json',
+    'columnar': 'application/vnd.sdrestful.columnar+json',
+    'msgpack': 'application/msgpack',
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+def get_list_format():
+    formats = {name: mimetype for name, mimetype in LIST_FORMATS.items() if name != 'msgpack' or msgpack}
+    name = request.args.get('format')
+    if name:
+        if name not in formats:
+            raise InvalidParameter(f"format must be one of {', '.join(formats)}")
+        return name
+    mimetypes = list(formats.values()) + (['application/x-msgpack'] if msgpack else [])
+    best = request.accept_mimetypes.best_match(mimetypes, default='application/json')
+    return next((name for name, mimetype in formats.items() if mimetype == best), 'msgpack')
+
+def get_stream_format(list_format):
+    if list_format in ('csv', 'ndjson'):
+        return list_format
+    if list_format in ('json', 'columnar') and request.args.get('stream') in ('1', 'true'):
+        return list_format
+    return None
+
+def encode_page(list_format, query, rows, columns):
+    if list_format == 'json':
+        return jsonify([query.to_dict(row) for row in rows]).get_data()
+    page = {"columns": columns, "rows": [list(row) for row in rows]}
+    if list_format == 'msgpack':
+        return msgpack.packb(page)
+    return jsonify(page).get_data()
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def stream_rows(conn, query, values, stream_format, to_dict=dict):
+    chunk_size = app.config['STREAM_CHUNK_SIZE']
+    dumps = app.json.dumps
+    count = 0
+    serialize_seconds = 0.0
+    try:
+        cursor = conn.execute(query, values)
+        columns = [column[0] for column in cursor.description]
+        if stream_format == 'json':
+            yield '['
+        elif stream_format == 'columnar':
+            yield '{"columns": ' + dumps(columns) + ', "rows": ['
+        elif stream_format == 'csv':
+            yield csv_lines([columns])
+        first = True
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            count += len(rows)
+            start = time.perf_counter()
+            if stream_format == 'ndjson':
+                chunk = ''.join(dumps(to_dict(row)) + '\n' for row in rows)
+            elif stream_format == 'csv':
+                chunk = csv_lines(rows)
+            else:
+                encode = to_dict if stream_format == 'json' else list
+                chunk = ','.join(dumps(encode(row)) for row in rows)
+                chunk = chunk if first else ',' + chunk
+                first = False
+            serialize_seconds += time.perf_counter() - start
+            yield chunk
+        if stream_format == 'json':
+            yield ']'
+        elif stream_format == 'columnar':
+            yield ']}'
+    finally:
+        conn.close()
+        SERIALIZE_DURATION.observe(current_endpoint(), value=serialize_seconds)
+        ROWS_RETURNED.observe(current_endpoint(), value=count)
+
+def set_next_link(response, next_cursor):
+    if next_cursor:
+        args = request.args.to_dict()
+        args['after'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+def get_table_versions(tables):
+    placeholders = ', '.join('?' * len(tables))
+    with get_db(readonly=True) as conn:
+        rows = conn.execute(f"SELECT name, version, modified FROM table_version WHERE name IN ({placeholders})", sorted(tables)).fetchall()
+    return {row['name']: (row['version'], row['modified']) for row in rows}
+
+def get_validators(tables):
+    versions = get_table_versions(tables)
+    args = sorted(request.args.items(multi=True))
+    key = json.dumps([sorted(versions.items()), args, request.headers.get('Accept', '')])
+    etag = f"{'.'.join(f'{name}-{version}' for name, (version, _) in sorted(versions.items()))}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding:
+        etag += f"-{encoding}"
+    last_modified = max((modified for _, modified in versions.values()), default=0)
+    return etag, datetime.fromtimestamp(last_modified, timezone.utc)
+
+def is_not_modified(etag, last_modified):
+    return bool(request.if_none_match) and request.if_none_match.contains(etag)
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+def table_written(table):
+    get_result_cache().invalidate(table)
+
+def list_response(query):
+    after = query.decode_after(request.args.get('after'))
+    etag, last_modified = get_validators(query.tables)
+    if is_not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = query_response(query, after, (request.path, etag))
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return set_validators(response, etag, last_modified)
+
+def query_response(query, after, cache_key):
+    list_format = get_list_format()
+    stream_format = get_stream_format(list_format)
+    if not stream_format:
+        cached = get_result_cache().get(cache_key)
+        if cached is None:
+            rows, columns, next_cursor = fetch_page(query, after, get_page_limit())
+            start = time.perf_counter()
+            body = encode_page(list_format, query, rows, columns)
+            SERIALIZE_DURATION.observe(current_endpoint(), value=time.perf_counter() - start)
+            ROWS_RETURNED.observe(current_endpoint(), value=len(rows))
+            cached = compress_body(body) + (next_cursor,)
+            get_result_cache().put(cache_key, cached, len(cached[0]), query.tables)
+        body, encoding, next_cursor = cached
+        response = Response(body, mimetype=LIST_FORMATS[list_format])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return set_next_link(response, next_cursor)
+
+    limit = get_page_limit(stream=True)
+    sql, values = query.sql(after=after)
+    conn = get_db(readonly=True)
+    try:
+        conn.execute("BEGIN")
+        next_cursor = probe_next_cursor(conn, query, after, limit)
+    except Exception:
+        conn.close()
+        raise
+    response = Response(stream_rows(conn, f"{sql} LIMIT ?", values + [limit], stream_format, query.to_dict), mimetype=LIST_FORMATS[stream_format])
+    response.call_on_close(conn.close)
+    return set_next_link(response, next_cursor)
+
+FILTER_COLUMNS = {
+    'folder': ('number', 'title', 'theme', 'slogan'),
+    'artist': ('id', 'name', 'pseudonym'),
+    'song': ('id', 'title', 'bpm', 'length', 'genre', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL'),
+}
+
+def filter_query(table, key):
+    params = {column: request.args.get(column) for column in FILTER_COLUMNS[table]}
+    query = ListQuery(table, key)
+    add_search(query, params)
+    query.where(*build_where_clause(params, table))
+    return query
+
+@app.route('/folders', methods=['GET'])
+def get_folders():
+    query = filter_query('folder', 'number')
+    add_projection(query, split_list(request.args.get('fields')))
+    return list_response(query)
+
+@app.route('/artists', methods=['GET'])
+def get_artists():
+    query = filter_query('artist', 'id')
+    add_projection(query, split_list(request.args.get('fields')))
+    return list_response(query)
 
 @app.route('/songs', methods=['GET'])
 def get_songs():
-    params = {
-        'id': request.args.get('id'),
-        'title': request.args.get('title'),
-        'bpm': request.args.get('bpm'),
-        'length': request.args.get('length'),
-        'genre': request.args.get('genre'),
-        'artist': request.args.get('artist'),
-        'folder': request.args.get('folder'),
-        'ln': request.args.get('ln'),
-        'diffN': request.args.get('diffN'),
-        'diffH': request.args.get('diffH'),
-        'diffA': request.args.get('diffA'),
-        'diffL': request.args.get('diffL')
-    }
-    where_clause, values = build_where_clause(params)
+    query = filter_query('song', 'id')
+    add_projection(query, split_list(request.args.get('fields')), split_list(request.args.get('expand')))
+    return list_response(query)
+
+TABLE_KEYS = {
+    'folder': 'number',
+    'artist': 'id',
+    'song': 'id',
+}
+
+def compact_changelog(conn, retention=None):
+    superseded = conn.execute("""
+    DELETE FROM changelog
+    WHERE seq < (SELECT MAX(seq) FROM changelog AS newer WHERE newer.tbl = changelog.tbl AND newer.key = changelog.key)
+    """).rowcount
+    pruned = 0
+    if retention is not None:
+        floor = conn.execute(
+            "SELECT MAX(seq) FROM changelog WHERE op = 'delete' AND changed_at < strftime('%s', 'now') - ?",
+            (retention,)
+        ).fetchone()[0]
+        if floor is not None:
+            pruned = conn.execute("DELETE FROM changelog WHERE op = 'delete' AND seq <= ?", (floor,)).rowcount
+            conn.execute("UPDATE changelog_state SET floor = MAX(floor, ?) WHERE id = 1", (floor,))
+    return superseded, pruned
+
+def changelog_bounds(conn):
+    return tuple(conn.execute(
+        "SELECT floor, MAX(floor, COALESCE((SELECT MAX(seq) FROM changelog), 0)) FROM changelog_state WHERE id = 1"
+    ).fetchone())
+
+@app.route('/changes', methods=['GET'])
+def get_changes():
+    conn = get_db(readonly=True)
+    try:
+        conn.execute("BEGIN")
+        floor, last_seq = changelog_bounds(conn)
+        since = request.args.get('since')
+        if not since:
+            return jsonify({"changes": [], "last_seq": last_seq, "has_more": False})
+        try:
+            since = int(since)
+        except ValueError:
+            raise InvalidParameter("since must be an integer")
+        if since < floor or since > last_seq:
+            return jsonify({"message": "Changes since this sequence number are not available, resync required", "floor": floor, "last_seq": last_seq}), 410
+
+        limit = get_page_limit()
+        changes = conn.execute(
+            "SELECT seq, tbl, op, key FROM changelog WHERE seq > ? ORDER BY seq LIMIT ?",
+            (since, limit + 1)
+        ).fetchall()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        expand = split_list(request.args.get('expand'))
+        rows = {}
+        for table, key in TABLE_KEYS.items():
+            keys = sorted({change['key'] for change in changes if change['tbl'] == table and change['op'] != 'delete'})
+            if keys:
+                query = ListQuery(table, key)
+                add_projection(query, expand=[relation for relation in expand if relation in RELATIONS.get(table, {})])
+                query.where(f"{table}.{key} IN ({', '.join('?' * len(keys))})", keys)
+                sql, values = query.sql()
+                for row in conn.execute(sql, values):
+                    rows[(table, row[key])] = query.to_dict(row)
+    finally:
+        conn.close()
+
+    return jsonify({
+        "changes": [
+            {
+                "seq": change['seq'],
+                "table": change['tbl'],
+                "op": change['op'],
+                "key": change['key'],
+                "row": rows.get((change['tbl'], change['key'])) if change['op'] != 'delete' else None,
+            }
+            for change in changes
+        ],
+        "last_seq": changes[-1]['seq'] if changes else since,
+        "has_more": has_more,
+    })
+
+SUGGEST_FIELDS = {
+    'title': ('song', 'title'),
+    'genre': ('song', 'genre'),
+    'name': ('artist', 'name'),
+    'pseudonym': ('artist', 'pseudonym'),
+    'folder': ('folder', 'title'),
+}
+
+suggest_index = SuggestIndex(SUGGEST_FIELDS)
+
+def suggest_rows(conn, table, keys=None):
+    key = TABLE_KEYS[table]
+    columns = ', '.join(column for source, column in SUGGEST_FIELDS.values() if source == table)
+    query = f"SELECT {key}, {columns} FROM {table}"
+    if keys is None:
+        return conn.execute(query)
+    return conn.execute(f"{query} WHERE {key} IN (SELECT value FROM json_each(?))", (json.dumps(keys),))
+
+def refresh_index(index, index_rows):
+    conn = get_db(readonly=True)
+    try:
+        conn.execute("BEGIN")
+        floor, last_seq = changelog_bounds(conn)
+        if index.seq == last_seq:
+            return
+        with index.lock:
+            if index.seq is None or index.seq < floor:
+                index.load(
+                    ((table, row[0], row) for table in TABLE_KEYS for row in index_rows(conn, table)),
+                    last_seq
+                )
+            elif index.seq < last_seq:
+                changed = {table: set() for table in TABLE_KEYS}
+                for change in conn.execute("SELECT tbl, key FROM changelog WHERE seq > ? AND seq <= ?", (index.seq, last_seq)):
+                    changed[change['tbl']].add(change['key'])
+                for table, keys in changed.items():
+                    if keys:
+                        rows = {row[0]: row for row in index_rows(conn, table, sorted(keys))}
+                        for key in keys:
+                            index.update(table, key, rows.get(key))
+                index.seq = last_seq
+    finally:
+        conn.close()
+
+@app.route('/suggest', methods=['GET'])
+def get_suggestions():
+    field = request.args.get('field', 'title')
+    if field not in SUGGEST_FIELDS:
+        raise InvalidParameter(f"field must be one of {', '.join(SUGGEST_FIELDS)}")
+    prefix = request.args.get('prefix', '').lstrip()
+    if not prefix:
+        raise InvalidParameter("prefix is required")
+    limit = request.args.get('limit')
+    try:
+        limit = int(limit) if limit else app.config['SUGGEST_LIMIT']
+    except ValueError:
+        raise InvalidParameter("limit must be an integer")
+    if limit < 1:
+        raise InvalidParameter("limit must be positive")
+    refresh_index(suggest_index, suggest_rows)
+    with suggest_index.lock:
+        suggestions = suggest_index.search(field, prefix, min(limit, app.config['SUGGEST_MAX_LIMIT']))
+    return jsonify(suggestions)
+
+similarity_index = SimilarityIndex('song', FEATURES) if numpy else None
+
+def similar_rows(conn, table, keys=None):
+    if table != similarity_index.table:
+        return []
+    query = f"SELECT id, {feature_columns()} FROM song"
+    if keys is None:
+        return conn.execute(query)
+    return conn.execute(f"{query} WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(keys),))
+
+@app.route('/songs/<int:id>/similar', methods=['GET'])
+def get_similar_songs(id):
+    if similarity_index is None:
+        return jsonify({"message": "Similarity search requires numpy"}), 501
+    k = request.args.get('k')
+    try:
+        k = int(k) if k else app.config['SIMILAR_K']
+    except ValueError:
+        raise InvalidParameter("k must be an integer")
+    if k < 1:
+        raise InvalidParameter("k must be positive")
+    query = ListQuery('song', 'id')
+    add_projection(query, split_list(request.args.get('fields')), split_list(request.args.get('expand')))
+
+    etag, last_modified = get_validators({'song'} | query.tables)
+    if is_not_modified(etag, last_modified):
+        return set_validators(Response(status=304), etag, last_modified)
+
+    refresh_index(similarity_index, similar_rows)
+    with similarity_index.lock:
+        matches = similarity_index.search(id, min(k, app.config['SIMILAR_MAX_K']))
+    if matches is None:
+        return jsonify({"message": "Song not found"}), 404
+
+    query.where("song.id IN (SELECT value FROM json_each(?))", [json.dumps([key for key, _ in matches])])
+    sql, values = query.sql()
+    with get_db(readonly=True) as conn:
+        rows = {row['id']: query.to_dict(row) for row in conn.execute(sql, values)}
+    songs = [dict(rows[key], distance=round(distance, 4)) for key, distance in matches if key in rows]
+    return set_validators(jsonify(songs), etag, last_modified)
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    dimensions = split_list(request.args.get('dimensions')) or list(DIMENSIONS)
+    unknown = [dimension for dimension in dimensions if dimension not in DIMENSIONS]
+    if unknown:
+        raise InvalidParameter(f"Unknown dimension {', '.join(unknown)}")
+    try:
+        folders = [int(folder) for folder in split_list(request.args.get('folder'))]
+    except ValueError:
+        raise InvalidParameter("folder must be a list of integers")
+    if not all(fits_integer(folder) for folder in folders):
+        raise InvalidParameter("folder is out of range")
+
+    etag, last_modified = get_validators({'song'})
+    if is_not_modified(etag, last_modified):
+        return set_validators(Response(status=304), etag, last_modified)
 
-    query = "SELECT * FROM song"
-    if where_clause:
-        query += f" WHERE {where_clause}"
+    values = [json.dumps(sorted(set(dimensions) | {'folder'}))]
+    if folders:
+        query = """
+        SELECT dimension, value, SUM(count) AS count FROM song_stats
+        WHERE dimension IN (SELECT value FROM json_each(?)) AND folder IN (SELECT value FROM json_each(?))
+        GROUP BY dimension, value ORDER BY dimension, value
+        """
+        values.append(json.dumps(folders))
+    else:
+        query = "SELECT dimension, value, count FROM song_stats_total WHERE dimension IN (SELECT value FROM json_each(?)) ORDER BY dimension, value"
+    with get_db(readonly=True) as conn:
+        rows = conn.execute(query, values).fetchall()
+
+    stats = {"songs": sum(row['count'] for row in rows if row['dimension'] == 'folder')}
+    for dimension in dimensions:
+        stats[dimension] = [{"value": row['value'], "count": row['count']} for row in rows if row['dimension'] == dimension]
+    return set_validators(jsonify(stats), etag, last_modified)
 
-    conn = get_db()
-    songs = conn.execute(query, values).fetchall()
-    conn.close()
+@app.route('/stats/rebuild', methods=['POST'])
+def rebuild_statistics():
+    rows = write(rebuild_stats)
+    return jsonify({"message": "Statistics rebuilt", "rows": rows}), 200
 
-    return jsonify([dict(song) for song in songs])
+@app.route('/changes/compact', methods=['POST'])
+def compact_changes():
+    retention = request.args.get('retention')
+    try:
+        retention = int(retention) if retention else None
+    except ValueError:
+        raise InvalidParameter("retention must be an integer number of seconds")
+    superseded, pruned = write(lambda conn: compact_changelog(conn, retention))
+    return jsonify({"message": "Changelog compacted", "superseded": superseded, "pruned": pruned}), 200
 
 @app.route('/folders', methods=['POST'])
 def create_folder():
@@ -101,10 +1063,8 @@ def create_folder():
         data.get('theme'),
         data.get('slogan')
     )
-    conn = get_db()
-    conn.execute(query, values)
-    conn.commit()
-    conn.close()
+    write(lambda conn: conn.execute(query, values).rowcount)
+    table_written('folder')
     return jsonify({"message": "Folder created successfully"}), 201
 
 @app.route('/artists', methods=['POST'])
@@ -118,11 +1078,8 @@ def create_artist():
         data['name'],
         data.get('pseudonym')
     )
-    conn = get_db()
-    conn.execute(query, values)
-    artist_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-    conn.commit()
-    conn.close()
+    artist_id = write(lambda conn: conn.execute(query, values).lastrowid)
+    table_written('artist')
     return jsonify({"message": "Artist created successfully", "id": artist_id}), 201
 
 @app.route('/songs', methods=['POST'])
@@ -145,53 +1102,238 @@ def create_song():
         data.get('diffA'),
         data.get('diffL')
     )
-    conn = get_db()
-    conn.execute(query, values)
-    song_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-    conn.commit()
-    conn.close()
+    song_id = write(lambda conn: conn.execute(query, values).lastrowid)
+    table_written('song')
     return jsonify({"message": "Song created successfully", "id": song_id}), 201
 
+CREATE_COLUMNS = {
+    'folder': ('number', 'title', 'theme', 'slogan'),
+    'artist': ('name', 'pseudonym'),
+    'song': ('title', 'bpm', 'length', 'genre', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL'),
+}
+
+REQUIRED_COLUMNS = {
+    'folder': ('number', 'title'),
+    'artist': ('name',),
+    'song': ('title',),
+}
+
+def validate_item(table, item):
+    if isinstance(item, ValueError):
+        raise item
+    if not isinstance(item, dict):
+        raise ValueError("Item must be a JSON object")
+    for column in REQUIRED_COLUMNS[table]:
+        if item.get(column) in (None, ''):
+            raise ValueError(f"{column} is required")
+    defaults = DEFAULT_VALUES.get(table, {})
+    return tuple(validate_value(column, item.get(column, defaults.get(column))) for column in CREATE_COLUMNS[table])
+
+def iter_batch_items():
+    if request.mimetype == 'application/x-ndjson':
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield ValueError("Invalid JSON")
+        return
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise InvalidParameter("Request body must be a JSON array or NDJSON stream")
+    yield from items
+
+def insert_batch(conn, table, pending, ids, errors):
+    if table == 'folder':
+        numbers = [values[0] for _, values in pending]
+        placeholders = ', '.join('?' * len(numbers))
+        taken = {row[0] for row in conn.execute(f"SELECT number FROM folder WHERE number IN ({placeholders})", numbers)}
+        accepted = []
+        for index, values in pending:
+            if values[0] in taken:
+                errors.append({"index": index, "message": f"Folder {values[0]} already exists"})
+            else:
+                taken.add(values[0])
+                accepted.append((index, values))
+        pending = accepted
+    if not pending:
+        return
+
+    columns = CREATE_COLUMNS[table]
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [values for _, values in pending]
+    )
+    if table == 'folder':
+        for index, values in pending:
+            ids[index] = values[0]
+    else:
+        first_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0] - len(pending) + 1
+        for offset, (index, _) in enumerate(pending):
+            ids[index] = first_id + offset
+
+def create_batch(table):
+    atomic = request.args.get('atomic') in ('1', 'true')
+    chunk_size = app.config['BATCH_CHUNK_SIZE']
+    errors = []
+    chunks = []
+    pending = []
+    count = 0
+    for index, item in enumerate(iter_batch_items()):
+        count += 1
+        try:
+            pending.append((index, validate_item(table, item)))
+        except ValueError as error:
+            errors.append({"index": index, "message": str(error)})
+        if atomic and errors:
+            return jsonify({"message": "Batch rejected", "errors": errors}), 400
+        if len(pending) >= chunk_size:
+            chunks.append(pending)
+            pending = []
+    if pending:
+        chunks.append(pending)
+
+    def insert(conn):
+        ids = {}
+        insert_errors = []
+        for chunk in chunks:
+            insert_batch(conn, table, chunk, ids, insert_errors)
+        if atomic and insert_errors:
+            raise Rollback((None, insert_errors))
+        return ids, insert_errors
+
+    ids, insert_errors = write(insert)
+    if ids is None:
+        return jsonify({"message": "Batch rejected", "errors": insert_errors}), 400
+    errors += insert_errors
+    if ids:
+        table_written(table)
+
+    errors.sort(key=lambda error: error["index"])
+    body = {
+        "message": f"{len(ids)} of {count} items created",
+        "ids": [ids.get(index) for index in range(count)],
+        "errors": errors,
+    }
+    if not errors:
+        return jsonify(body), 201
+    return jsonify(body), 207 if ids else 400
+
+@app.route('/folders/batch', methods=['POST'])
+def create_folders_batch():
+    return create_batch('folder')
+
+@app.route('/artists/batch', methods=['POST'])
+def create_artists_batch():
+    return create_batch('artist')
+
+@app.route('/songs/batch', methods=['POST'])
+def create_songs_batch():
+    return create_batch('song')
+
+def get_transfer_table():
+    table = request.args.get('table')
+    if table not in TABLES:
+        raise InvalidParameter(f"table must be one of {', '.join(TABLES)}")
+    return table
+
+@app.route('/export', methods=['GET'])
+def export_table():
+    table = get_transfer_table()
+    stream_format = request.args.get('format')
+    if stream_format is None:
+        best = request.accept_mimetypes.best_match([LIST_FORMATS['ndjson'], LIST_FORMATS['csv']], default=LIST_FORMATS['ndjson'])
+        stream_format = 'csv' if best == LIST_FORMATS['csv'] else 'ndjson'
+    elif stream_format not in FORMATS:
+        raise InvalidParameter(f"format must be one of {', '.join(FORMATS)}")
+    conn = get_db(readonly=True)
+    response = Response(stream_rows(conn, export_query(table), [], stream_format), mimetype=LIST_FORMATS[stream_format])
+    response.call_on_close(conn.close)
+    response.headers['Content-Disposition'] = f'attachment; filename="{table}.{stream_format}"'
+    return response
+
+def spool_import(table, stream, stream_format):
+    spool = tempfile.SpooledTemporaryFile(max_size=app.config['IMPORT_SPOOL_SIZE'])
+    chunks = 0
+    rows = 0
+    try:
+        for first, chunk in validate_chunks(table, read_records(stream, stream_format), chunk_size=app.config['IMPORT_CHUNK_SIZE']):
+            pickle.dump((first, chunk), spool, pickle.HIGHEST_PROTOCOL)
+            chunks += 1
+            rows += len(chunk)
+    except (ValueError, UnicodeDecodeError) as error:
+        spool.close()
+        raise InvalidParameter(f"Import rejected, no rows were written: {error}")
+    spool.seek(0)
+    return spool, chunks, rows
+
+@app.route('/import', methods=['POST'])
+def import_table():
+    table = get_transfer_table()
+    stream_format = request.args.get('format') or ('csv' if request.mimetype == LIST_FORMATS['csv'] else 'ndjson')
+    if stream_format not in FORMATS:
+        raise InvalidParameter(f"format must be one of {', '.join(FORMATS)}")
+    start = time.perf_counter()
+    spool, chunks, records = spool_import(table, io.TextIOWrapper(request.stream, encoding='utf-8', newline=''), stream_format)
+    defer = request.args.get('defer')
+    defer = defer in ('1', 'true') if defer else records >= app.config['IMPORT_DEFER_MIN_ROWS']
+
+    def load(conn):
+        try:
+            return load_chunks(conn, table, (pickle.load(spool) for _ in range(chunks)), defer)
+        except ValueError as error:
+            raise InvalidParameter(f"Import rejected, no rows were written: {error}")
+
+    try:
+        rows = write(load)
+    finally:
+        spool.close()
+    seconds = time.perf_counter() - start
+    if rows:
+        table_written(table)
+    return jsonify({
+        "message": f"{rows} rows imported",
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+    }), 200
+
 @app.route('/folders/<int:number>', methods=['DELETE'])
 def delete_folder(number):
-    conn = get_db()
-    cursor = conn.execute("SELECT COUNT(*) FROM song WHERE folder = ?", (number,))
-    count = cursor.fetchone()[0]
-    if count > 0:
-        conn.close()
+    def delete(conn):
+        cursor = conn.execute("SELECT COUNT(*) FROM song WHERE folder = ?", (number,))
+        if cursor.fetchone()[0] > 0:
+            return False
+        conn.execute("DELETE FROM folder WHERE number = ?", (number,))
+        return True
+
+    if not write(delete):
         return jsonify({"message": "Folder cannot be deleted as it has associated songs"}), 400
-    
-    conn.execute("DELETE FROM folder WHERE number = ?", (number,))
-    conn.commit()
-    conn.close()
+    table_written('folder')
     return jsonify({"message": "Folder deleted successfully"}), 200
 
 
 @app.route('/artists/<int:id>', methods=['DELETE'])
 def delete_artist(id):
-    conn = get_db()
-    cursor = conn.execute("SELECT COUNT(*) FROM song WHERE artist = ?", (id,))
-    count = cursor.fetchone()[0]
-    if count > 0:
-        conn.close()
+    def delete(conn):
+        cursor = conn.execute("SELECT COUNT(*) FROM song WHERE artist = ?", (id,))
+        if cursor.fetchone()[0] > 0:
+            return False
+        conn.execute("DELETE FROM artist WHERE id = ?", (id,))
+        return True
+
+    if not write(delete):
         return jsonify({"message": "Artist cannot be deleted as they have associated songs"}), 400
-    conn.execute("DELETE FROM artist WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    table_written('artist')
     return jsonify({"message": "Artist deleted successfully"}), 200
 
 @app.route('/songs/<int:id>', methods=['DELETE'])
 def delete_song(id):
-    conn = get_db()
-    cursor = conn.execute("SELECT COUNT(*) FROM song WHERE id = ?", (id,))
-    count = cursor.fetchone()[0]
-    if count == 0:
-        conn.close()
+    if not write(lambda conn: conn.execute("DELETE FROM song WHERE id = ?", (id,)).rowcount):
         return jsonify({"message": "Song not found"}), 404
-    
-    conn.execute("DELETE FROM song WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    table_written('song')
     return jsonify({"message": "Song deleted successfully"}), 200
 
 @app.route('/folders/<int:number>', methods=['PUT'])
@@ -213,10 +1355,8 @@ def update_folder(number):
     if update_fields:
         query = f"UPDATE folder SET {', '.join(update_fields)} WHERE number = ?"
         values.append(number)
-        conn = get_db()
-        conn.execute(query, values)
-        conn.commit()
-        conn.close()
+        write(lambda conn: conn.execute(query, values).rowcount)
+        table_written('folder')
         return jsonify({"message": "Folder updated successfully"}), 200
     else:
         return jsonify({"message": "No valid fields to update"}), 400
@@ -237,10 +1377,8 @@ def update_artist(id):
     if update_fields:
         query = f"UPDATE artist SET {', '.join(update_fields)} WHERE id = ?"
         values.append(id)
-        conn = get_db()
-        conn.execute(query, values)
-        conn.commit()
-        conn.close()
+        write(lambda conn: conn.execute(query, values).rowcount)
+        table_written('artist')
         return jsonify({"message": "Artist updated successfully"}), 200
     else:
         return jsonify({"message": "No valid fields to update"}), 400
@@ -288,13 +1426,142 @@ def update_song(id):
     if update_fields:
         query = f"UPDATE song SET {', '.join(update_fields)} WHERE id = ?"
         values.append(id)
-        conn = get_db()
-        conn.execute(query, values)
-        conn.commit()
-        conn.close()
+        write(lambda conn: conn.execute(query, values).rowcount)
+        table_written('song')
         return jsonify({"message": "Song updated successfully"}), 200
     else:
         return jsonify({"message": "No valid fields to update"}), 400
 
+UPDATE_COLUMNS = {
+    'folder': ('title', 'theme', 'slogan'),
+    'artist': ('name', 'pseudonym'),
+    'song': ('title', 'bpm', 'length', 'genre', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL'),
+}
+
+def parse_ids(value):
+    if isinstance(value, str):
+        try:
+            value = [int(item) for item in split_list(value)]
+        except ValueError:
+            raise InvalidParameter("ids must be integers")
+    if not isinstance(value, list) or not value or not all(isinstance(item, int) and not isinstance(item, bool) and fits_integer(item) for item in value):
+        raise InvalidParameter("ids must be a non-empty list of integers")
+    return sorted(set(value))
+
+def missing_keys(conn, table, ids):
+    return [row[0] for row in conn.execute(
+        f"SELECT value FROM json_each(?) WHERE value NOT IN (SELECT {TABLE_KEYS[table]} FROM {table})",
+        (json.dumps(ids),)
+    )]
+
+def missing_reference(conn, table, changes):
+    for column, (target, target_key) in RELATIONS.get(table, {}).items():
+        value = changes.get(column)
+        if value is not None and conn.execute(f"SELECT 1 FROM {target} WHERE {target_key} = ?", (value,)).fetchone() is None:
+            return f"{target.capitalize()} {value} does not exist"
+    return None
+
+def referencing_columns(table):
+    return [(source, column) for source, relations in RELATIONS.items() for column, (target, _) in relations.items() if target == table]
+
+def bulk_update(table):
+    key = TABLE_KEYS[table]
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('set'), dict):
+        raise InvalidParameter('Request body must be a JSON object with a "set" object')
+    changes = data['set']
+    unknown = [column for column in changes if column not in UPDATE_COLUMNS[table]]
+    if unknown:
+        raise InvalidParameter(f"Cannot update {', '.join(unknown)}")
+    if not changes:
+        return jsonify({"message": "No valid fields to update"}), 400
+    for column in REQUIRED_COLUMNS[table]:
+        if column in changes and changes[column] in (None, ''):
+            raise InvalidParameter(f"{column} is required")
+    try:
+        values = [validate_value(column, value) for column, value in changes.items()]
+    except ValueError as error:
+        raise InvalidParameter(str(error))
+
+    query = filter_query(table, key)
+    ids = parse_ids(data['ids']) if 'ids' in data else None
+    if ids is not None:
+        query.where(f"{table}.{key} IN (SELECT value FROM json_each(?))", [json.dumps(ids)])
+    if not query.clauses:
+        raise InvalidParameter("ids or a filter is required")
+    selection, selection_values = query.sql(columns=f"{table}.{key}")
+
+    def update(conn):
+        error = missing_reference(conn, table, changes)
+        if error:
+            return error, 0, []
+        updated = conn.execute(
+            f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in changes)} WHERE {key} IN ({selection})",
+            values + selection_values
+        ).rowcount
+        return None, updated, missing_keys(conn, table, ids) if ids is not None else []
+
+    error, updated, missing = write(update)
+    if error:
+        return jsonify({"message": error}), 400
+    if updated:
+        table_written(table)
+    return jsonify({"message": f"{updated} {table}s updated", "updated": updated, "missing": missing}), 200
+
+def bulk_delete(table):
+    key = TABLE_KEYS[table]
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and 'ids' in data:
+        ids = parse_ids(data['ids'])
+    elif request.args.get('ids'):
+        ids = parse_ids(request.args['ids'])
+    else:
+        raise InvalidParameter("ids is required")
+
+    def delete(conn):
+        for source, column in referencing_columns(table):
+            blocked = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {column} FROM {source} WHERE {column} IN (SELECT value FROM json_each(?)) ORDER BY {column}",
+                (json.dumps(ids),)
+            )]
+            if blocked:
+                return (source, blocked), 0, []
+        missing = missing_keys(conn, table, ids)
+        deleted = conn.execute(f"DELETE FROM {table} WHERE {key} IN (SELECT value FROM json_each(?))", (json.dumps(ids),)).rowcount
+        return None, deleted, missing
+
+    blocked, deleted, missing = write(delete)
+    if blocked:
+        source, keys = blocked
+        return jsonify({"message": f"{table.capitalize()}s cannot be deleted as they have associated {source}s", "blocked": keys}), 400
+    if not deleted:
+        return jsonify({"message": f"No {table}s found", "deleted": 0, "missing": missing}), 404
+    table_written(table)
+    return jsonify({"message": f"{deleted} {table}s deleted", "deleted": deleted, "missing": missing}), 200
+
+@app.route('/folders', methods=['PATCH'])
+def update_folders():
+    return bulk_update('folder')
+
+@app.route('/artists', methods=['PATCH'])
+def update_artists():
+    return bulk_update('artist')
+
+@app.route('/songs', methods=['PATCH'])
+def update_songs():
+    return bulk_update('song')
+
+@app.route('/folders', methods=['DELETE'])
+def delete_folders():
+    return bulk_delete('folder')
+
+@app.route('/artists', methods=['DELETE'])
+def delete_artists():
+    return bulk_delete('artist')
+
+@app.route('/songs', methods=['DELETE'])
+def delete_songs():
+    return bulk_delete('song')
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+
+from benchmark.catalog import generate_catalog
+from benchmark.runner import compare, load_results, run_benchmark, start_server
+
+SCENARIOS = ('list', 'search', 'create', 'update', 'delete', 'mixed')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description="Load testing tools for the music database API")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Generate a reproducible synthetic catalog database")
+    generate.add_argument('--db', default='benchmark.db', help="Path of the database to create (overwritten)")
+    generate.add_argument('--folders', type=int, default=30)
+    generate.add_argument('--artists', type=int, default=2000)
+    generate.add_argument('--songs', type=int, default=100000)
+    generate.add_argument('--seed', type=int, default=1)
+
+    run = commands.add_parser('run', help="Drive the API endpoints and report throughput and latency percentiles")
+    run.add_argument('--url', default='http://localhost:5000', help="Base URL of a running server")
+    run.add_argument('--serve', metavar='DB', help="Start a local server on --port against this database instead of using --url")
+    run.add_argument('--port', type=int, default=5055)
+    run.add_argument('--workers', type=int, default=1, help="Worker processes for the server started by --serve")
+    run.add_argument('--catalog', help="Manifest written by generate; discovered from the server when omitted")
+    run.add_argument('--scenarios', default=','.join(SCENARIOS), help="Comma-separated subset of: " + ', '.join(SCENARIOS))
+    run.add_argument('--concurrency', type=int, default=8)
+    run.add_argument('--duration', type=float, default=10.0, help="Seconds per scenario")
+    run.add_argument('--requests', type=int, help="Requests per worker per scenario, instead of --duration")
+    run.add_argument('--page-size', type=int, default=100)
+    run.add_argument('--read-ratio', type=float, default=0.9, help="Fraction of reads in the mixed scenario")
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('--output', default='benchmark.json')
+
+    diff = commands.add_parser('compare', help="Compare two result files and flag regressions")
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=0.1, help="Relative change treated as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        manifest = generate_catalog(args.db, args.folders, args.artists, args.songs, args.seed)
+        print(json.dumps(manifest, indent=2))
+        return 0
+
+    if args.command == 'compare':
+        rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+        for row in rows:
+            flag = 'REGRESSION' if row['regressed'] else ''
+            print(f"{row['scenario']:<8} {row['metric']:<11} {row['baseline']:>12} {row['current']:>12} {row['change']:>+8.1%} {flag}")
+        return 1 if any(row['regressed'] for row in rows) else 0
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    catalog = load_results(args.catalog) if args.catalog else None
+
+    server = None
+    url = args.url
+    if args.serve:
+        server, url = start_server(args.serve, args.port, args.workers)
+    try:
+        report = run_benchmark(url, scenarios, args.concurrency, None if args.requests else args.duration,
+                               args.requests, args.page_size, args.read_ratio, args.seed, catalog)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    report['meta']['workers'] = args.workers if args.serve else None
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, result in report['results'].items():
+        print(f"{name:<8} {result['throughput']:>9.1f} req/s  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  errors {result['errors']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import json
+import os
+import random
+import sqlite3
+import time
+
+from migrate import analyze, migrate
+
+WORDS = (
+    'love', 'eternity', 'fire', 'storm', 'sakura', 'blue', 'rain', 'gold', 'rush', 'heroic',
+    'verse', 'symbolic', 'rising', 'sun', 'message', 'holy', 'grail', 'night', 'dream', 'light',
+    'shadow', 'neon', 'cyber', 'star', 'moon', 'river', 'crystal', 'thunder', 'angel', 'ghost',
+    'silver', 'spiral', 'echo', 'pulse', 'velocity', 'horizon', 'mirage', 'phoenix', 'saga', 'zero',
+)
+
+GENRES = (
+    'Trance', 'Hard Dance', 'Hardcore', 'Pop', 'Happy Hardcore', 'Hard Trance', 'Pop Trance',
+    'Japanese Pop', 'Drum & Bass', 'Techno', 'House', 'Eurobeat', 'Breakbeat', 'Speedcore', 'Ambient',
+)
+
+THEMES = ('Heroic', 'Bistro', 'Cyber', 'Race', 'Ninja', 'Space', 'Ocean', 'Retro', 'Future', 'Festival')
+
+def phrase(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).title()
+
+def generate_folders(rng, count):
+    for number in range(1, count + 1):
+        yield (number, phrase(rng, 1, 2).upper(), rng.choice(THEMES), f"{phrase(rng, 2, 4)}!")
+
+def generate_artists(rng, count):
+    for _ in range(count):
+        name = phrase(rng, 2, 2)
+        yield (name, rng.choice((None, name.split()[0].upper(), f"DJ {name.split()[-1].upper()}")))
+
+def generate_songs(rng, count, artists, folders):
+    for _ in range(count):
+        low = rng.randint(80, 200)
+        bpm = f"{low}-{low + rng.randint(20, 120)}" if rng.random() < 0.05 else str(low)
+        normal = rng.randint(1, 7)
+        hyper = min(12, normal + rng.randint(1, 3))
+        another = min(12, hyper + rng.randint(1, 3))
+        leggendaria = min(12, another + 1) if rng.random() < 0.1 else 0
+        yield (
+            phrase(rng, 1, 4),
+            bpm,
+            rng.randint(90, 300),
+            rng.choice(GENRES),
+            rng.randint(1, artists),
+            rng.randint(1, folders),
+            int(rng.random() < 0.2),
+            normal, hyper, another, leggendaria,
+        )
+
+def generate_catalog(path, folders=30, artists=2000, songs=100000, seed=1, batch_size=10000):
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    migrate(conn)
+
+    conn.executemany("INSERT INTO folder (number, title, theme, slogan) VALUES (?, ?, ?, ?)", generate_folders(rng, folders))
+    conn.executemany("INSERT INTO artist (name, pseudonym) VALUES (?, ?)", generate_artists(rng, artists))
+    rows = generate_songs(rng, songs, artists, folders)
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO song (title, bpm, length, genre, artist, folder, ln, diffN, diffH, diffA, diffL) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+    conn.commit()
+    analyze(conn)
+    conn.close()
+
+    manifest = {
+        'database': path,
+        'folders': folders,
+        'artists': artists,
+        'songs': songs,
+        'seed': seed,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with open(f"{path}.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,237 @@
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmark.catalog import GENRES, WORDS
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'throughput': round(count / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) * 1000 / count, 3) if count else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if count else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if count else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if count else None,
+        'max_ms': round(latencies[-1] * 1000, 3) if count else None,
+    }
+
+def find_max_id(session, url, path):
+    def exists(value):
+        response = session.get(f"{url}{path}", params={'fields': 'id', 'id_gte': value, 'limit': 1})
+        response.raise_for_status()
+        return bool(response.json())
+
+    if not exists(1):
+        return 0
+    low, high = 1, 2
+    while exists(high):
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if exists(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+def random_song(rng, max_artist, max_folder):
+    return {
+        'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title(),
+        'bpm': str(rng.randint(80, 200)),
+        'length': rng.randint(90, 300),
+        'genre': rng.choice(GENRES),
+        'artist': rng.randint(1, max(1, max_artist)),
+        'folder': rng.randint(1, max(1, max_folder)),
+        'ln': rng.randint(0, 1),
+        'diffN': rng.randint(1, 7),
+        'diffH': rng.randint(4, 10),
+        'diffA': rng.randint(8, 12),
+        'diffL': 0,
+    }
+
+class Scenarios:
+    def __init__(self, catalog, page_size, read_ratio):
+        self.catalog = catalog
+        self.page_size = page_size
+        self.read_ratio = read_ratio
+        self.deletable = []
+        self.lock = threading.Lock()
+
+    def list(self, rng):
+        path = rng.choice(('/songs', '/songs', '/artists', '/folders'))
+        return 'GET', path, {'limit': self.page_size}, None
+
+    def search(self, rng):
+        choice = rng.randint(0, 3)
+        if choice == 0:
+            params = {'q': rng.choice(WORDS)}
+        elif choice == 1:
+            params = {'title': rng.choice(WORDS), 'genre': rng.choice(GENRES)}
+        elif choice == 2:
+            low = rng.randint(1, 10)
+            params = {'folder': rng.randint(1, max(1, self.catalog['folders'])), 'diffA_gte': low, 'diffA_lte': low + 2}
+        else:
+            low = rng.randint(80, 180)
+            params = {'bpm_min': low, 'bpm_max': low + 20}
+        params['limit'] = self.page_size
+        return 'GET', '/songs', params, None
+
+    def create(self, rng):
+        return 'POST', '/songs', None, random_song(rng, self.catalog['artists'], self.catalog['folders'])
+
+    def update(self, rng):
+        song_id = rng.randint(1, max(1, self.catalog['songs']))
+        return 'PUT', f"/songs/{song_id}", None, {'diffA': rng.randint(1, 12), 'length': rng.randint(90, 300)}
+
+    def delete(self, rng):
+        with self.lock:
+            song_id = self.deletable.pop() if self.deletable else None
+        if song_id is None:
+            return self.create(rng)
+        return 'DELETE', f"/songs/{song_id}", None, None
+
+    def mixed(self, rng):
+        if rng.random() < self.read_ratio:
+            return self.search(rng) if rng.random() < 0.5 else self.list(rng)
+        return self.update(rng) if rng.random() < 0.7 else self.create(rng)
+
+    def prepare_delete(self, session, url, count, rng):
+        items = [random_song(rng, self.catalog['artists'], self.catalog['folders']) for _ in range(count)]
+        for start in range(0, len(items), 1000):
+            response = session.post(f"{url}/songs/batch", json=items[start:start + 1000])
+            response.raise_for_status()
+            self.deletable += [song_id for song_id in response.json()['ids'] if song_id is not None]
+
+def run_scenario(url, scenario, concurrency, duration, requests_per_worker, seed):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        sent = 0
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if requests_per_worker is not None and sent >= requests_per_worker:
+                break
+            method, path, params, body = scenario(rng)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, f"{url}{path}", params=params, json=body)
+                response.content
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+            sent += 1
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def start_server(database, port, workers=1):
+    command = [sys.executable, '-m', 'serve', '--database', database, '--port', str(port), '--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{url}/folders", params={'limit': 1}, timeout=1)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Server did not start")
+
+def run_benchmark(url, scenarios, concurrency=8, duration=10.0, requests_per_worker=None,
+                  page_size=100, read_ratio=0.9, seed=1, catalog=None):
+    session = requests.Session()
+    if catalog is None:
+        catalog = {
+            'songs': find_max_id(session, url, '/songs'),
+            'artists': find_max_id(session, url, '/artists'),
+            'folders': len(session.get(f"{url}/folders", params={'limit': 1000}).json()),
+        }
+    catalog = {key: catalog[key] for key in ('folders', 'artists', 'songs')}
+    plan = Scenarios(catalog, page_size, read_ratio)
+
+    results = {}
+    for name in scenarios:
+        if name == 'delete':
+            total = requests_per_worker * concurrency if requests_per_worker else int(duration * 500)
+            plan.prepare_delete(session, url, total, random.Random(seed))
+        results[name] = run_scenario(url, getattr(plan, name), concurrency, duration, requests_per_worker, seed)
+    session.close()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'url': url,
+            'concurrency': concurrency,
+            'duration': duration,
+            'requests_per_worker': requests_per_worker,
+            'page_size': page_size,
+            'read_ratio': read_ratio,
+            'seed': seed,
+            'catalog': catalog,
+        },
+        'results': results,
+    }
+
+def compare(baseline, current, threshold=0.1):
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        for metric, higher_is_better in (('throughput', True), ('p50_ms', False), ('p95_ms', False), ('p99_ms', False)):
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change < -threshold if higher_is_better else change > threshold
+            rows.append({'scenario': name, 'metric': metric, 'baseline': old, 'current': new,
+                         'change': round(change, 4), 'regressed': regressed})
+    return rows
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
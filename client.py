@@ -3,16 +3,284 @@ from tkinter import ttk, messagebox, simpledialog
 import requests
 import sv_ttk
 import json
+import queue
+import random
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.util.retry import Retry
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+API_URL = "http://localhost:5000"
+PAGE_SIZE = 500
+WORKERS = 4
+RETRIES = 4
+RETRY_BACKOFF = 0.5
+RETRY_JITTER = 0.5
+POLL_INTERVAL = 20
+SUGGEST_DELAY = 150
+SUGGEST_LIMIT = 8
+ROW_HEIGHT = 20
+VIEW_MARGIN = 20
+WHEEL_ROWS = 3
+SONG_PARAMS = {
+    "expand": "artist,folder",
+    "fields": "id,title,bpm,length,genre,ln,diffN,diffH,diffA,diffL,artist.name,artist.pseudonym,folder.title",
+}
+PATH_PARAMS = {"/songs": SONG_PARAMS}
+COLUMNAR_TYPE = "application/vnd.sdrestful.columnar+json"
+MSGPACK_TYPE = "application/msgpack"
+LIST_ACCEPT = f"{MSGPACK_TYPE}, {COLUMNAR_TYPE};q=0.9, application/json;q=0.5" if msgpack else f"{COLUMNAR_TYPE}, application/json;q=0.5"
+
+class JitteredRetry(Retry):
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        return seconds + random.uniform(0, seconds * RETRY_JITTER)
+
+def create_session():
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = requests.utils.DEFAULT_ACCEPT_ENCODING
+    retry = JitteredRetry(total=RETRIES, connect=0, read=0, status=RETRIES, status_forcelist=(503,), allowed_methods=None, backoff_factor=RETRY_BACKOFF, backoff_jitter=RETRY_BACKOFF, raise_on_status=False)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_pages(session, path, params=None, etag=None):
+    params = dict(PATH_PARAMS.get(path, {}), **(params or {}), limit=PAGE_SIZE)
+    headers = {"Accept": LIST_ACCEPT}
+    if etag:
+        headers["If-None-Match"] = etag
+    while True:
+        response = session.get(f"{API_URL}{path}", params=params, headers=headers)
+        yield response
+        cursor = response.headers.get("X-Next-Cursor")
+        if response.status_code != 200 or not cursor:
+            return
+        params["after"] = cursor
+        headers.pop("If-None-Match", None)
+
+def decode_rows(response):
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type == MSGPACK_TYPE:
+        page = msgpack.unpackb(response.content)
+    elif content_type == COLUMNAR_TYPE:
+        page = response.json()
+    else:
+        return response.json()
+    columns = [column.rpartition(".") for column in page["columns"]]
+    relations = {relation for relation, _, _ in columns if relation}
+    rows = []
+    for values in page["rows"]:
+        row = {relation: {} for relation in relations}
+        for (relation, _, name), value in zip(columns, values):
+            if relation:
+                row[relation][name] = value
+            else:
+                row[name] = value
+        for relation in relations:
+            if all(value is None for value in row[relation].values()):
+                row[relation] = None
+        rows.append(row)
+    return rows
+
+def ref_id(value, key):
+    return value[key] if isinstance(value, dict) else value
+
+def song_values(song):
+    artist = song["artist"]
+    folder = song["folder"]
+    artist_label = artist["pseudonym"] or artist["name"] if isinstance(artist, dict) else artist
+    folder_label = folder["title"] if isinstance(folder, dict) else folder
+    return (song["id"], song["title"], song["bpm"], song["length"], song["genre"], artist_label, folder_label, song["ln"], song["diffN"], song["diffH"], song["diffA"], song["diffL"], ref_id(artist, "id"), ref_id(folder, "number"))
+
+def artist_values(artist):
+    return (artist["id"], artist["name"], artist["pseudonym"])
+
+def folder_values(folder):
+    return (folder["number"], folder["title"], folder["theme"], folder["slogan"])
+
+def sort_key(value):
+    return (value is None, isinstance(value, str), value.casefold() if isinstance(value, str) else value)
+
+class VirtualTree:
+    def __init__(self, parent, columns):
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.columns = columns
+        self.data = [[] for _ in columns]
+        self.order = []
+        self.positions = {}
+        self.selected = []
+        self.first = 0
+        self.sort_column = None
+        self.sort_reverse = False
+        self.more = None
+        for index, column in enumerate(columns):
+            self.tree.heading(column, text=column, command=lambda index=index: self.sort_by(index))
+        self.tree.bind("<Configure>", lambda event: self.refresh())
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda event: self.move(-1))
+        self.tree.bind("<Down>", lambda event: self.move(1))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows()))
+        self.tree.bind("<Home>", lambda event: self.scroll(-len(self.order)))
+        self.tree.bind("<End>", lambda event: self.scroll(len(self.order)))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def row(self, position):
+        return tuple(column[position] for column in self.data)
+
+    def visible_rows(self):
+        row_height = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or ROW_HEIGHT)
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def reset(self, rows):
+        self.data = [[] for _ in self.columns]
+        self.order = []
+        self.positions = {}
+        self.selected = []
+        self.first = 0
+        self.extend(rows)
+
+    def extend(self, rows):
+        for values in rows:
+            self.put(values)
+        self.resort()
+
+    def upsert(self, values):
+        self.put(values)
+        self.resort()
+
+    def put(self, values):
+        key = str(values[0])
+        position = self.positions.get(key)
+        if position is None:
+            self.positions[key] = len(self.order)
+            self.order.append(len(self.data[0]))
+            for column, value in zip(self.data, values):
+                column.append(value)
+        else:
+            for column, value in zip(self.data, values):
+                column[self.order[position]] = value
+
+    def remove(self, key):
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+        row = self.order.pop(position)
+        for column in self.data:
+            column[row] = None
+        for other, index in self.positions.items():
+            if index > position:
+                self.positions[other] = index - 1
+        if key in self.selected:
+            self.selected.remove(key)
+        self.refresh()
+
+    def sort_by(self, index):
+        self.sort_reverse = self.sort_column == index and not self.sort_reverse
+        self.sort_column = index
+        for column_index, column in enumerate(self.columns):
+            arrow = (" \u25bc" if self.sort_reverse else " \u25b2") if column_index == index else ""
+            self.tree.heading(column, text=column + arrow)
+        self.first = 0
+        self.resort()
+
+    def resort(self):
+        if self.sort_column is not None:
+            column = self.data[self.sort_column]
+            self.order.sort(key=lambda row: sort_key(column[row]), reverse=self.sort_reverse)
+            keys = self.data[0]
+            self.positions = {str(keys[row]): position for position, row in enumerate(self.order)}
+        self.refresh()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.order))
+        else:
+            self.first += int(args[1]) * (self.visible_rows() if args[2] == "pages" else 1)
+        self.refresh()
+
+    def scroll(self, rows):
+        self.first += rows
+        self.refresh()
+        return "break"
+
+    def move(self, step):
+        if not self.order:
+            return "break"
+        key = self.selected[-1] if self.selected else None
+        position = self.positions[key] + step if key in self.positions else self.first
+        position = max(0, min(position, len(self.order) - 1))
+        visible = self.visible_rows()
+        if position < self.first:
+            self.first = position
+        elif position >= self.first + visible:
+            self.first = position - visible + 1
+        self.selected = [str(self.data[0][self.order[position]])]
+        self.refresh()
+        self.tree.focus(self.selected[0])
+        return "break"
+
+    def refresh(self):
+        total = len(self.order)
+        visible = self.visible_rows()
+        self.first = max(0, min(self.first, total - visible))
+        start = max(0, self.first - VIEW_MARGIN)
+        stop = min(total, self.first + visible + VIEW_MARGIN)
+        self.tree.delete(*self.tree.get_children())
+        for row in self.order[start:stop]:
+            values = self.row(row)
+            self.tree.insert("", tk.END, iid=str(values[0]), values=values)
+        self.tree.yview_moveto(0)
+        self.tree.yview_scroll(self.first - start, "units")
+        self.tree.selection_set([key for key in self.selected if self.tree.exists(key)])
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        if self.more is not None and stop + VIEW_MARGIN >= total:
+            more, self.more = self.more, None
+            more()
+
+    def on_select(self, event):
+        shown = set(self.tree.get_children())
+        self.selected = [key for key in self.selected if key not in shown] + list(self.tree.selection())
+
+    def selected_values(self):
+        for key in reversed(self.selected):
+            if key in self.positions:
+                return self.row(self.order[self.positions[key]])
+        return None
 
 class Application(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Music Database Client")
+        self.etags = {}
+        self.load_tokens = {}
+        self.change_seq = None
+        self.session = create_session()
+        self.executor = ThreadPoolExecutor(max_workers=WORKERS)
+        self.ui_queue = queue.Queue()
+        self.protocol("WM_DELETE_WINDOW", self.shutdown)
+        self.after(POLL_INTERVAL, self.process_ui_queue)
 
         self.create_widgets()
-        self.fetch_and_display_songs()
-        self.fetch_and_display_artists()
-        self.fetch_and_display_folders()
+        self.reload_all()
 
     def create_widgets(self):
         self.notebook = ttk.Notebook(self)
@@ -31,10 +299,9 @@ class Application(tk.Tk):
         self.create_folder_tab()
 
     def create_song_tab(self):
-        self.tree_songs = ttk.Treeview(self.song_frame, columns=("ID", "Title", "BPM", "Length", "Genre", "Artist", "Folder", "LN", "DiffN", "DiffH", "DiffA", "DiffL"), show="headings")
-        for col in self.tree_songs["columns"]:
-            self.tree_songs.heading(col, text=col)
-        self.tree_songs.pack(fill=tk.BOTH, expand=True)
+        self.song_view = VirtualTree(self.song_frame, ("ID", "Title", "BPM", "Length", "Genre", "Artist", "Folder", "LN", "DiffN", "DiffH", "DiffA", "DiffL", "ArtistID", "FolderID"))
+        self.song_view.tree["displaycolumns"] = self.song_view.columns[:12]
+        self.song_view.frame.pack(fill=tk.BOTH, expand=True)
 
         song_button_frame = ttk.Frame(self.song_frame)
         song_button_frame.pack(fill=tk.X, pady=10)
@@ -45,10 +312,8 @@ class Application(tk.Tk):
         ttk.Button(song_button_frame, text="Search Songs", command=self.search_songs).pack(side=tk.LEFT, padx=5)
 
     def create_artist_tab(self):
-        self.tree_artists = ttk.Treeview(self.artist_frame, columns=("ID", "Name", "Pseudonym"), show="headings")
-        for col in self.tree_artists["columns"]:
-            self.tree_artists.heading(col, text=col)
-        self.tree_artists.pack(fill=tk.BOTH, expand=True)
+        self.artist_view = VirtualTree(self.artist_frame, ("ID", "Name", "Pseudonym"))
+        self.artist_view.frame.pack(fill=tk.BOTH, expand=True)
 
         artist_button_frame = ttk.Frame(self.artist_frame)
         artist_button_frame.pack(fill=tk.X, pady=10)
@@ -59,10 +324,8 @@ class Application(tk.Tk):
         ttk.Button(artist_button_frame, text="Search Artists", command=self.search_artists).pack(side=tk.LEFT, padx=5)
 
     def create_folder_tab(self):
-        self.tree_folders = ttk.Treeview(self.folder_frame, columns=("Number", "Title", "Theme", "Slogan"), show="headings")
-        for col in self.tree_folders["columns"]:
-            self.tree_folders.heading(col, text=col)
-        self.tree_folders.pack(fill=tk.BOTH, expand=True)
+        self.folder_view = VirtualTree(self.folder_frame, ("Number", "Title", "Theme", "Slogan"))
+        self.folder_view.frame.pack(fill=tk.BOTH, expand=True)
 
         folder_button_frame = ttk.Frame(self.folder_frame)
         folder_button_frame.pack(fill=tk.X, pady=10)
@@ -72,34 +335,162 @@ class Application(tk.Tk):
         ttk.Button(folder_button_frame, text="Delete Folder", command=self.delete_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(folder_button_frame, text="Search Folders", command=self.search_folders).pack(side=tk.LEFT, padx=5)
 
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        self.destroy()
+
+    def process_ui_queue(self):
+        try:
+            while True:
+                try:
+                    callback = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback()
+        finally:
+            self.after(POLL_INTERVAL, self.process_ui_queue)
+
+    def run_in_background(self, func, callback=None):
+        def task():
+            try:
+                result = func()
+            except Exception as error:
+                message = str(error) or type(error).__name__
+                self.ui_queue.put(lambda: messagebox.showerror("error", message))
+            else:
+                if callback:
+                    self.ui_queue.put(lambda: callback(result))
+        return self.executor.submit(task)
+
+    def send(self, method, path, callback, **kwargs):
+        return self.run_in_background(lambda: self.session.request(method, f"{API_URL}{path}", **kwargs), callback)
+
+    def load_view(self, view, path, values, params=None, on_loaded=None):
+        token = self.load_tokens.get(view, 0) + 1
+        self.load_tokens[view] = token
+        key = (path, tuple(sorted((params or {}).items())))
+        shown_key, etag = self.etags.get(view, (None, None))
+        if shown_key != key:
+            etag = None
+        pages = fetch_pages(self.session, path, params, etag)
+        state = {"first": True, "etag": None}
+
+        def is_stale():
+            return self.load_tokens.get(view) != token
+
+        def fetch_page():
+            response = next(pages, None)
+            if response is None or is_stale():
+                return None
+            if response.status_code != 200:
+                return response.status_code, None, None
+            rows = [values(row) for row in decode_rows(response)]
+            return 200, rows, response.headers
+
+        def show_page(result):
+            if result is None or is_stale():
+                return
+            status, rows, headers = result
+            first = state["first"]
+            state["first"] = False
+            if status == 304:
+                if on_loaded:
+                    on_loaded(True)
+                return
+            if status != 200:
+                if first:
+                    self.etags.pop(view, None)
+                    if on_loaded:
+                        on_loaded(False)
+                return
+            has_more = bool(headers.get("X-Next-Cursor"))
+            view.more = load_page if has_more else None
+            if first:
+                state["etag"] = headers.get("ETag", "")
+                self.etags[view] = (key, None)
+                view.reset(rows)
+                if on_loaded:
+                    on_loaded(True)
+            else:
+                view.extend(rows)
+            if not has_more:
+                self.etags[view] = (key, state["etag"])
+
+        def load_page():
+            if not is_stale():
+                self.run_in_background(fetch_page, show_page)
+
+        load_page()
+
     def fetch_and_display_songs(self):
-        response = requests.get("http://localhost:5000/songs")
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_songs.delete(*self.tree_songs.get_children())
-            for song in data:
-                self.tree_songs.insert("", tk.END, values=(song["id"], song["title"], song["bpm"], song["length"], song["genre"], song["artist"], song["folder"], song["ln"], song["diffN"], song["diffH"], song["diffA"], song["diffL"]))
+        self.load_view(self.song_view, "/songs", song_values)
 
     def fetch_and_display_artists(self):
-        response = requests.get("http://localhost:5000/artists")
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_artists.delete(*self.tree_artists.get_children())
-            for artist in data:
-                self.tree_artists.insert("", tk.END, values=(artist["id"], artist["name"], artist["pseudonym"]))
+        self.load_view(self.artist_view, "/artists", artist_values)
 
     def fetch_and_display_folders(self):
-        response = requests.get("http://localhost:5000/folders")
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_folders.delete(*self.tree_folders.get_children())
-            for folder in data:
-                self.tree_folders.insert("", tk.END, values=(folder["number"], folder["title"], folder["theme"], folder["slogan"]))
+        self.load_view(self.folder_view, "/folders", folder_values)
+
+    def reload_all(self):
+        def done(response):
+            self.change_seq = response.json()["last_seq"] if response.status_code == 200 else None
+            self.fetch_and_display_songs()
+            self.fetch_and_display_artists()
+            self.fetch_and_display_folders()
+
+        self.send("GET", "/changes", done)
+
+    def sync_changes(self):
+        if self.change_seq is None:
+            self.reload_all()
+            return
+        since = self.change_seq
+
+        def work():
+            changes = []
+            seq = since
+            while True:
+                response = self.session.get(f"{API_URL}/changes", params={"since": seq, "limit": PAGE_SIZE, "expand": SONG_PARAMS["expand"]})
+                if response.status_code != 200:
+                    return None
+                data = response.json()
+                changes += data["changes"]
+                seq = data["last_seq"]
+                if not data["has_more"]:
+                    return changes, seq
+
+        def done(result):
+            if result is None:
+                self.reload_all()
+                return
+            changes, seq = result
+            self.apply_changes(changes)
+            self.change_seq = max(self.change_seq or 0, seq)
+
+        self.run_in_background(work, done)
+
+    def apply_changes(self, changes):
+        views = {
+            "song": (self.song_view, song_values),
+            "artist": (self.artist_view, artist_values),
+            "folder": (self.folder_view, folder_values),
+        }
+        for change in changes:
+            view, values = views[change["table"]]
+            key = str(change["key"])
+            shown_key, _ = self.etags.get(view, (None, None))
+            if change["row"] is None:
+                view.remove(key)
+            elif key in view or (shown_key is not None and not shown_key[1]):
+                view.upsert(values(change["row"]))
+            if shown_key is not None:
+                self.etags[view] = (shown_key, None)
 
     def add_song(self):
         data = {
             "title": simpledialog.askstring("Input", "Title"),
-            "bpm": simpledialog.askinteger("Input", "BPM"),
+            "bpm": simpledialog.askstring("Input", "BPM"),
             "length": simpledialog.askinteger("Input", "Length"),
             "genre": simpledialog.askstring("Input", "Genre"),
             "artist": simpledialog.askinteger("Input", "Artist ID"),
@@ -110,97 +501,105 @@ class Application(tk.Tk):
             "diffA": simpledialog.askinteger("Input", "DiffA"),
             "diffL": simpledialog.askinteger("Input", "DiffL"),
         }
-        response = requests.post("http://localhost:5000/songs", json=data)
-        if response.status_code == 201:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_songs()
+        def done(response):
+            if response.status_code == 201:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+
+        self.send("POST", "/songs", done, json=data)
 
     def edit_song(self):
-        selected_item = self.tree_songs.selection()
-        if not selected_item:
+        values = self.song_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No song selected")
             return
 
-        item = self.tree_songs.item(selected_item)
-        song_id = item["values"][0]
+        song_id = values[0]
         data = {
-            "title": simpledialog.askstring("Input", "Title", initialvalue=item["values"][1]),
-            "bpm": simpledialog.askinteger("Input", "BPM", initialvalue=item["values"][2]),
-            "length": simpledialog.askinteger("Input", "Length", initialvalue=item["values"][3]),
-            "genre": simpledialog.askstring("Input", "Genre", initialvalue=item["values"][4]),
-            "artist": simpledialog.askinteger("Input", "Artist ID", initialvalue=item["values"][5]),
-            "folder": simpledialog.askinteger("Input", "Folder Number", initialvalue=item["values"][6]),
-            "ln": simpledialog.askinteger("Input", "LN", initialvalue=item["values"][7]),
-            "diffN": simpledialog.askinteger("Input", "DiffN", initialvalue=item["values"][8]),
-            "diffH": simpledialog.askinteger("Input", "DiffH", initialvalue=item["values"][9]),
-            "diffA": simpledialog.askinteger("Input", "DiffA", initialvalue=item["values"][10]),
-            "diffL": simpledialog.askinteger("Input", "DiffL", initialvalue=item["values"][11]),
+            "title": simpledialog.askstring("Input", "Title", initialvalue=values[1]),
+            "bpm": simpledialog.askstring("Input", "BPM", initialvalue=values[2]),
+            "length": simpledialog.askinteger("Input", "Length", initialvalue=values[3]),
+            "genre": simpledialog.askstring("Input", "Genre", initialvalue=values[4]),
+            "artist": simpledialog.askinteger("Input", "Artist ID", initialvalue=values[12]),
+            "folder": simpledialog.askinteger("Input", "Folder Number", initialvalue=values[13]),
+            "ln": simpledialog.askinteger("Input", "LN", initialvalue=values[7]),
+            "diffN": simpledialog.askinteger("Input", "DiffN", initialvalue=values[8]),
+            "diffH": simpledialog.askinteger("Input", "DiffH", initialvalue=values[9]),
+            "diffA": simpledialog.askinteger("Input", "DiffA", initialvalue=values[10]),
+            "diffL": simpledialog.askinteger("Input", "DiffL", initialvalue=values[11]),
         }
-        response = requests.put(f"http://localhost:5000/songs/{song_id}", json=data)
-        if response.status_code == 200:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_songs()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("PUT", f"/songs/{song_id}", done, json=data)
 
     def delete_song(self):
-        selected_item = self.tree_songs.selection()
-        if not selected_item:
+        values = self.song_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No song selected")
             return
 
-        item = self.tree_songs.item(selected_item)
-        song_id = item["values"][0]
-        response = requests.delete(f"http://localhost:5000/songs/{song_id}")
-        if response.status_code == 200:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_songs()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        song_id = values[0]
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("DELETE", f"/songs/{song_id}", done)
 
     def add_artist(self):
         data = {
             "name": simpledialog.askstring("Input", "Name"),
             "pseudonym": simpledialog.askstring("Input", "Pseudonym"),
         }
-        response = requests.post("http://localhost:5000/artists", json=data)
-        if response.status_code == 201:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_artists()
+        def done(response):
+            if response.status_code == 201:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+
+        self.send("POST", "/artists", done, json=data)
 
     def edit_artist(self):
-        selected_item = self.tree_artists.selection()
-        if not selected_item:
+        values = self.artist_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No artist selected")
             return
 
-        item = self.tree_artists.item(selected_item)
-        artist_id = item["values"][0]
+        artist_id = values[0]
         data = {
-            "name": simpledialog.askstring("Input", "Name", initialvalue=item["values"][1]),
-            "pseudonym": simpledialog.askstring("Input", "Pseudonym", initialvalue=item["values"][2]),
+            "name": simpledialog.askstring("Input", "Name", initialvalue=values[1]),
+            "pseudonym": simpledialog.askstring("Input", "Pseudonym", initialvalue=values[2]),
         }
-        response = requests.put(f"http://localhost:5000/artists/{artist_id}", json=data)
-        if response.status_code == 200:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_artists()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("PUT", f"/artists/{artist_id}", done, json=data)
 
     def delete_artist(self):
-        selected_item = self.tree_artists.selection()
-        if not selected_item:
+        values = self.artist_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No artist selected")
             return
 
-        item = self.tree_artists.item(selected_item)
-        artist_id = item["values"][0]
-        response = requests.delete(f"http://localhost:5000/artists/{artist_id}")
-        if response.status_code == 200:
-            messagebox.showinfo("message", response.json()["message"])
-            self.fetch_and_display_artists()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        artist_id = values[0]
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("message", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("DELETE", f"/artists/{artist_id}", done)
 
     def add_folder(self):
         data = {
@@ -209,46 +608,50 @@ class Application(tk.Tk):
             "theme": simpledialog.askstring("Input", "Theme"),
             "slogan": simpledialog.askstring("Input", "Slogan"),
         }
-        response = requests.post("http://localhost:5000/folders", json=data)
-        if response.status_code == 201:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_folders()
+        def done(response):
+            if response.status_code == 201:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+
+        self.send("POST", "/folders", done, json=data)
 
     def edit_folder(self):
-        selected_item = self.tree_folders.selection()
-        if not selected_item:
+        values = self.folder_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No folder selected")
             return
 
-        item = self.tree_folders.item(selected_item)
-        folder_id = item["values"][0]
+        folder_id = values[0]
         data = {
-            "number": simpledialog.askinteger("Input", "Number", initialvalue=item["values"][0]),
-            "title": simpledialog.askstring("Input", "Title", initialvalue=item["values"][1]),
-            "theme": simpledialog.askstring("Input", "Theme", initialvalue=item["values"][2]),
-            "slogan": simpledialog.askstring("Input", "Slogan", initialvalue=item["values"][3]),
+            "number": simpledialog.askinteger("Input", "Number", initialvalue=values[0]),
+            "title": simpledialog.askstring("Input", "Title", initialvalue=values[1]),
+            "theme": simpledialog.askstring("Input", "Theme", initialvalue=values[2]),
+            "slogan": simpledialog.askstring("Input", "Slogan", initialvalue=values[3]),
         }
-        response = requests.put(f"http://localhost:5000/folders/{folder_id}", json=data)
-        if response.status_code == 200:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_folders()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("PUT", f"/folders/{folder_id}", done, json=data)
 
     def delete_folder(self):
-        selected_item = self.tree_folders.selection()
-        if not selected_item:
+        values = self.folder_view.selected_values()
+        if values is None:
             messagebox.showwarning("Warning", "No folder selected")
             return
 
-        item = self.tree_folders.item(selected_item)
-        folder_id = item["values"][0]
-        response = requests.delete(f"http://localhost:5000/folders/{folder_id}")
-        if response.status_code == 200:
-            messagebox.showinfo("Success", response.json()["message"])
-            self.fetch_and_display_folders()
-        else:
-            messagebox.showinfo("error", response.json()["message"])
+        folder_id = values[0]
+        def done(response):
+            if response.status_code == 200:
+                messagebox.showinfo("Success", response.json()["message"])
+                self.sync_changes()
+            else:
+                messagebox.showinfo("error", response.json()["message"])
+
+        self.send("DELETE", f"/folders/{folder_id}", done)
 
     def search_songs(self):
         self.create_search_window(
@@ -266,7 +669,8 @@ class Application(tk.Tk):
                 "diffL": tk.StringVar(),
             },
             "Search Songs",
-            self.perform_search_songs
+            self.perform_search_songs,
+            {"title": "title", "genre": "genre"}
         )
 
     def search_artists(self):
@@ -276,7 +680,8 @@ class Application(tk.Tk):
                 "pseudonym": tk.StringVar(),
             },
             "Search Artists",
-            self.perform_search_artists
+            self.perform_search_artists,
+            {"name": "name", "pseudonym": "pseudonym"}
         )
 
     def search_folders(self):
@@ -288,48 +693,84 @@ class Application(tk.Tk):
                 "slogan": tk.StringVar(),
             },
             "Search Folders",
-            self.perform_search_folders
+            self.perform_search_folders,
+            {"title": "folder"}
         )
 
-    def create_search_window(self, params, title, search_func):
+    def create_search_window(self, params, title, search_func, suggest_fields=None):
         search_window = tk.Toplevel(self)
         search_window.title(title)
 
         for idx, (key, var) in enumerate(params.items()):
             ttk.Label(search_window, text=key.capitalize()).grid(row=idx, column=0, padx=5, pady=5)
             ttk.Entry(search_window, textvariable=var).grid(row=idx, column=1, padx=5, pady=5)
+            if suggest_fields and key in suggest_fields:
+                self.attach_suggestions(search_window, var, suggest_fields[key], idx)
 
         ttk.Button(search_window, text="Search", command=lambda: search_func(params, search_window)).grid(row=len(params), column=0, columnspan=2, pady=10)
 
+    def attach_suggestions(self, window, var, field, row):
+        listbox = tk.Listbox(window, height=SUGGEST_LIMIT, exportselection=False)
+        state = {"after": None, "token": 0, "chosen": None}
+
+        def show(suggestions):
+            listbox.delete(0, tk.END)
+            for suggestion in suggestions:
+                listbox.insert(tk.END, suggestion)
+            if suggestions:
+                listbox.grid(row=row, column=2, padx=5, pady=5, sticky="nsew")
+            else:
+                listbox.grid_remove()
+
+        def fetch():
+            state["after"] = None
+            state["token"] += 1
+            token = state["token"]
+            prefix = var.get().lstrip()
+            if not prefix:
+                show([])
+                return
+
+            def work():
+                response = self.session.get(f"{API_URL}/suggest", params={"field": field, "prefix": prefix, "limit": SUGGEST_LIMIT})
+                return response.json() if response.status_code == 200 else []
+
+            def done(suggestions):
+                if token == state["token"] and window.winfo_exists():
+                    show(suggestions)
+
+            self.run_in_background(work, done)
+
+        def changed(*_):
+            if var.get() == state["chosen"]:
+                return
+            state["chosen"] = None
+            if state["after"] is not None:
+                window.after_cancel(state["after"])
+            state["after"] = window.after(SUGGEST_DELAY, fetch)
+
+        def choose(event):
+            selection = listbox.curselection()
+            if selection:
+                state["chosen"] = listbox.get(selection[0])
+                state["token"] += 1
+                var.set(state["chosen"])
+                show([])
+
+        var.trace_add("write", changed)
+        listbox.bind("<<ListboxSelect>>", choose)
+
     def perform_search_songs(self, params, window):
         query_params = {key: var.get() for key, var in params.items() if var.get()}
-        response = requests.get("http://localhost:5000/songs", params=query_params)
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_songs.delete(*self.tree_songs.get_children())
-            for song in data:
-                self.tree_songs.insert("", tk.END, values=(song["id"], song["title"], song["bpm"], song["length"], song["genre"], song["artist"], song["folder"], song["ln"], song["diffN"], song["diffH"], song["diffA"], song["diffL"]))
-            window.destroy()
+        self.load_view(self.song_view, "/songs", song_values, query_params, lambda loaded: loaded and window.destroy())
 
     def perform_search_artists(self, params, window):
         query_params = {key: var.get() for key, var in params.items() if var.get()}
-        response = requests.get("http://localhost:5000/artists", params=query_params)
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_artists.delete(*self.tree_artists.get_children())
-            for artist in data:
-                self.tree_artists.insert("", tk.END, values=(artist["id"], artist["name"], artist["pseudonym"]))
-            window.destroy()
+        self.load_view(self.artist_view, "/artists", artist_values, query_params, lambda loaded: loaded and window.destroy())
 
     def perform_search_folders(self, params, window):
         query_params = {key: var.get() for key, var in params.items() if var.get()}
-        response = requests.get("http://localhost:5000/folders", params=query_params)
-        if response.status_code == 200:
-            data = response.json()
-            self.tree_folders.delete(*self.tree_folders.get_children())
-            for folder in data:
-                self.tree_folders.insert("", tk.END, values=(folder["number"], folder["title"], folder["theme"], folder["slogan"]))
-            window.destroy()
+        self.load_view(self.folder_view, "/folders", folder_values, query_params, lambda loaded: loaded and window.destroy())
 
 if __name__ == "__main__":
     app = Application()
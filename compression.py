@@ -0,0 +1,64 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ENCODINGS = ('zstd', 'gzip') if zstandard else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def compressor(encoding, level):
+    if encoding == 'zstd':
+        return ZstdCompressor(level)
+    return GzipCompressor(level)
+
+
+def compress(data, encoding, level):
+    stream = compressor(encoding, level)
+    return stream.compress(data) + stream.finish()
+
+
+def compress_chunks(chunks, encoding, level):
+    stream = compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            data = stream.compress(chunk.encode() if isinstance(chunk, str) else chunk) + stream.flush()
+            if data:
+                yield data
+        yield stream.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class GzipCompressor:
+    def __init__(self, level):
+        self._stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._stream.compress(data)
+
+    def flush(self):
+        return self._stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._stream.flush()
+
+
+class ZstdCompressor:
+    def __init__(self, level):
+        self._stream = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._stream.compress(data)
+
+    def flush(self):
+        return self._stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._stream.flush()
@@ -1,9 +1,46 @@
+import argparse
+import os
 import sqlite3
 
-connection = sqlite3.connect('database.db')
+from migrate import analyze, migrate, schema_version
+from stats import check_stats, rebuild_stats
 
-with open('schema.sql') as f:
-    connection.executescript(f.read())
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the music database")
+    parser.add_argument('--database', default='database.db')
+    parser.add_argument('--reset', action='store_true', help="Delete the database and start over")
+    parser.add_argument('--no-seed', action='store_true', help="Do not load seed.sql into a new database")
+    parser.add_argument('--analyze', action='store_true', help="Refresh the query planner statistics")
+    parser.add_argument('--rebuild-stats', action='store_true', help="Recompute the song_stats summary tables from the song table")
+    args = parser.parse_args()
 
-connection.commit()
-connection.close()
\ No newline at end of file
+    if args.reset:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.database + suffix):
+                os.remove(args.database + suffix)
+    created = not os.path.exists(args.database)
+
+    connection = sqlite3.connect(args.database)
+    for name in migrate(connection):
+        print(f"Applied {name}")
+
+    if created and not args.no_seed:
+        with open('seed.sql') as f:
+            connection.executescript(f.read())
+        print("Loaded seed.sql")
+
+    if args.rebuild_stats:
+        drift = check_stats(connection)
+        rows = rebuild_stats(connection)
+        print(f"Rebuilt song statistics: {rows} rows, {drift} differed")
+
+    if args.analyze:
+        analyze(connection)
+        print("Analyzed")
+
+    print(f"Schema version {schema_version(connection)}")
+    connection.commit()
+    connection.close()
+
+if __name__ == '__main__':
+    main()
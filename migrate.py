@@ -0,0 +1,85 @@
+import glob
+import importlib.util
+import os
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+def discover_migrations():
+    migrations = []
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '[0-9]*'))):
+        name, extension = os.path.splitext(os.path.basename(path))
+        if extension in ('.sql', '.py'):
+            migrations.append((int(name.split('_', 1)[0]), name, path))
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version in migrations/")
+    return migrations
+
+def split_statements(script):
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement.strip()
+            statement = ''
+    if statement.strip():
+        raise ValueError(f"Incomplete SQL statement: {statement.strip()[:80]}")
+
+def applied_versions(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+def schema_version(conn):
+    row = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'").fetchone()
+    if row is None:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+def latest_version():
+    return max((version for version, _, _ in discover_migrations()), default=0)
+
+def pending_migrations(conn):
+    applied = applied_versions(conn)
+    return [migration for migration in discover_migrations() if migration[0] not in applied]
+
+def apply_migration(conn, version, name, path):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if path.endswith('.sql'):
+            with open(path) as f:
+                for statement in split_statements(f.read()):
+                    conn.execute(statement)
+        else:
+            spec = importlib.util.spec_from_file_location(f"migration_{name}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.migrate(conn)
+        conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def migrate(conn):
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        applied = []
+        for version, name, path in pending_migrations(conn):
+            apply_migration(conn, version, name, path)
+            applied.append(name)
+        return applied
+    finally:
+        conn.isolation_level = isolation_level
+
+def analyze(conn):
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
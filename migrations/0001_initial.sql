@@ -0,0 +1,29 @@
+CREATE TABLE IF NOT EXISTS folder (
+    number INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    theme TEXT,
+    slogan TEXT
+);
+
+CREATE TABLE IF NOT EXISTS artist (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    pseudonym TEXT
+);
+
+CREATE TABLE IF NOT EXISTS song (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    bpm TEXT,
+    length INTEGER,
+    genre TEXT,
+    artist INTEGER,
+    folder INTEGER,
+    ln BOOLEAN DEFAULT 0,
+    diffN INTEGER,
+    diffH INTEGER,
+    diffA INTEGER,
+    diffL INTEGER,
+    FOREIGN KEY (artist) REFERENCES artist(id) ON DELETE SET NULL,
+    FOREIGN KEY (folder) REFERENCES folder(number) ON DELETE CASCADE
+);
@@ -0,0 +1,10 @@
+COLUMNS = {
+    'bpm_min': "CAST(NULLIF(trim(CASE WHEN instr(bpm, '-') THEN substr(bpm, 1, instr(bpm, '-') - 1) ELSE bpm END), '') AS INTEGER)",
+    'bpm_max': "CAST(NULLIF(trim(CASE WHEN instr(bpm, '-') THEN substr(bpm, instr(bpm, '-') + 1) ELSE bpm END), '') AS INTEGER)",
+}
+
+def migrate(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(song)")}
+    for name, expression in COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE song ADD COLUMN {name} INTEGER GENERATED ALWAYS AS ({expression}) VIRTUAL")
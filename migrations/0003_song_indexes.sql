@@ -0,0 +1,7 @@
+CREATE INDEX IF NOT EXISTS song_artist_idx ON song (artist);
+CREATE INDEX IF NOT EXISTS song_folder_diffN_idx ON song (folder, diffN);
+CREATE INDEX IF NOT EXISTS song_folder_diffH_idx ON song (folder, diffH);
+CREATE INDEX IF NOT EXISTS song_folder_diffA_idx ON song (folder, diffA);
+CREATE INDEX IF NOT EXISTS song_folder_diffL_idx ON song (folder, diffL);
+CREATE INDEX IF NOT EXISTS song_bpm_idx ON song (bpm_min, bpm_max);
+CREATE INDEX IF NOT EXISTS song_length_idx ON song (length);
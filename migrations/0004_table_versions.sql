@@ -0,0 +1,43 @@
+CREATE TABLE IF NOT EXISTS table_version (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    modified INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+
+INSERT OR IGNORE INTO table_version (name) VALUES ('folder'), ('artist'), ('song');
+
+CREATE TRIGGER IF NOT EXISTS folder_version_insert AFTER INSERT ON folder BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'folder';
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_version_update AFTER UPDATE ON folder BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'folder';
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_version_delete AFTER DELETE ON folder BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'folder';
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_version_insert AFTER INSERT ON artist BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'artist';
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_version_update AFTER UPDATE ON artist BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'artist';
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_version_delete AFTER DELETE ON artist BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'artist';
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_version_insert AFTER INSERT ON song BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'song';
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_version_update AFTER UPDATE ON song BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'song';
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_version_delete AFTER DELETE ON song BEGIN
+    UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = 'song';
+END;
@@ -0,0 +1,55 @@
+CREATE TABLE IF NOT EXISTS changelog (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    op TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    changed_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS changelog_key_idx ON changelog (tbl, key, seq);
+
+CREATE TABLE IF NOT EXISTS changelog_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    floor INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO changelog_state (id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS folder_changelog_insert AFTER INSERT ON folder BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('folder', 'insert', new.number);
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_changelog_update AFTER UPDATE ON folder BEGIN
+    INSERT INTO changelog (tbl, op, key) SELECT 'folder', 'delete', old.number WHERE old.number != new.number;
+    INSERT INTO changelog (tbl, op, key) VALUES ('folder', CASE WHEN old.number = new.number THEN 'update' ELSE 'insert' END, new.number);
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_changelog_delete AFTER DELETE ON folder BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('folder', 'delete', old.number);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_changelog_insert AFTER INSERT ON artist BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('artist', 'insert', new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_changelog_update AFTER UPDATE ON artist BEGIN
+    INSERT INTO changelog (tbl, op, key) SELECT 'artist', 'delete', old.id WHERE old.id != new.id;
+    INSERT INTO changelog (tbl, op, key) VALUES ('artist', CASE WHEN old.id = new.id THEN 'update' ELSE 'insert' END, new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_changelog_delete AFTER DELETE ON artist BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('artist', 'delete', old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_changelog_insert AFTER INSERT ON song BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('song', 'insert', new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_changelog_update AFTER UPDATE ON song BEGIN
+    INSERT INTO changelog (tbl, op, key) SELECT 'song', 'delete', old.id WHERE old.id != new.id;
+    INSERT INTO changelog (tbl, op, key) VALUES ('song', CASE WHEN old.id = new.id THEN 'update' ELSE 'insert' END, new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_changelog_delete AFTER DELETE ON song BEGIN
+    INSERT INTO changelog (tbl, op, key) VALUES ('song', 'delete', old.id);
+END;
@@ -0,0 +1,61 @@
+CREATE VIRTUAL TABLE IF NOT EXISTS folder_fts USING fts5(
+    title, theme, slogan,
+    content='folder', content_rowid='number', tokenize='trigram'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS artist_fts USING fts5(
+    name, pseudonym,
+    content='artist', content_rowid='id', tokenize='trigram'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS song_fts USING fts5(
+    title, genre,
+    content='song', content_rowid='id', tokenize='trigram'
+);
+
+INSERT INTO folder_fts (folder_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)');
+INSERT INTO artist_fts (artist_fts, rank) VALUES ('rank', 'bm25(5.0, 10.0)');
+INSERT INTO song_fts (song_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0)');
+
+CREATE TRIGGER IF NOT EXISTS folder_fts_insert AFTER INSERT ON folder BEGIN
+    INSERT INTO folder_fts (rowid, title, theme, slogan) VALUES (new.number, new.title, new.theme, new.slogan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_fts_delete AFTER DELETE ON folder BEGIN
+    INSERT INTO folder_fts (folder_fts, rowid, title, theme, slogan) VALUES ('delete', old.number, old.title, old.theme, old.slogan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS folder_fts_update AFTER UPDATE OF number, title, theme, slogan ON folder BEGIN
+    INSERT INTO folder_fts (folder_fts, rowid, title, theme, slogan) VALUES ('delete', old.number, old.title, old.theme, old.slogan);
+    INSERT INTO folder_fts (rowid, title, theme, slogan) VALUES (new.number, new.title, new.theme, new.slogan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_fts_insert AFTER INSERT ON artist BEGIN
+    INSERT INTO artist_fts (rowid, name, pseudonym) VALUES (new.id, new.name, new.pseudonym);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_fts_delete AFTER DELETE ON artist BEGIN
+    INSERT INTO artist_fts (artist_fts, rowid, name, pseudonym) VALUES ('delete', old.id, old.name, old.pseudonym);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artist_fts_update AFTER UPDATE OF id, name, pseudonym ON artist BEGIN
+    INSERT INTO artist_fts (artist_fts, rowid, name, pseudonym) VALUES ('delete', old.id, old.name, old.pseudonym);
+    INSERT INTO artist_fts (rowid, name, pseudonym) VALUES (new.id, new.name, new.pseudonym);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_fts_insert AFTER INSERT ON song BEGIN
+    INSERT INTO song_fts (rowid, title, genre) VALUES (new.id, new.title, new.genre);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_fts_delete AFTER DELETE ON song BEGIN
+    INSERT INTO song_fts (song_fts, rowid, title, genre) VALUES ('delete', old.id, old.title, old.genre);
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_fts_update AFTER UPDATE OF id, title, genre ON song BEGIN
+    INSERT INTO song_fts (song_fts, rowid, title, genre) VALUES ('delete', old.id, old.title, old.genre);
+    INSERT INTO song_fts (rowid, title, genre) VALUES (new.id, new.title, new.genre);
+END;
+
+INSERT INTO folder_fts (folder_fts) VALUES ('rebuild');
+INSERT INTO artist_fts (artist_fts) VALUES ('rebuild');
+INSERT INTO song_fts (song_fts) VALUES ('rebuild');
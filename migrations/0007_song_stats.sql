@@ -0,0 +1,161 @@
+CREATE TABLE IF NOT EXISTS song_stats (
+    folder INTEGER,
+    dimension TEXT NOT NULL,
+    value,
+    count INTEGER NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS song_stats_key_idx ON song_stats (dimension, IFNULL(folder, ''), IFNULL(value, ''));
+CREATE INDEX IF NOT EXISTS song_stats_empty_idx ON song_stats (count) WHERE count = 0;
+
+CREATE TABLE IF NOT EXISTS song_stats_total (
+    dimension TEXT NOT NULL,
+    value,
+    count INTEGER NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS song_stats_total_key_idx ON song_stats_total (dimension, IFNULL(value, ''));
+CREATE INDEX IF NOT EXISTS song_stats_total_empty_idx ON song_stats_total (count) WHERE count = 0;
+
+CREATE TRIGGER IF NOT EXISTS song_stats_insert AFTER INSERT ON song BEGIN
+    INSERT INTO song_stats (folder, dimension, value, count)
+    SELECT NEW.folder, dimension, value, 1 FROM (
+        SELECT 'folder' AS dimension, NEW.folder AS value
+        UNION ALL SELECT 'artist', NEW.artist
+        UNION ALL SELECT 'genre', NULLIF(NEW.genre, '')
+        UNION ALL SELECT 'ln', NEW.ln
+        UNION ALL SELECT 'diffN', NEW.diffN
+        UNION ALL SELECT 'diffH', NEW.diffH
+        UNION ALL SELECT 'diffA', NEW.diffA
+        UNION ALL SELECT 'diffL', NEW.diffL
+        UNION ALL SELECT 'bpm', NEW.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(folder, ''), IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO song_stats_total (dimension, value, count)
+    SELECT dimension, value, 1 FROM (
+        SELECT 'folder' AS dimension, NEW.folder AS value
+        UNION ALL SELECT 'artist', NEW.artist
+        UNION ALL SELECT 'genre', NULLIF(NEW.genre, '')
+        UNION ALL SELECT 'ln', NEW.ln
+        UNION ALL SELECT 'diffN', NEW.diffN
+        UNION ALL SELECT 'diffH', NEW.diffH
+        UNION ALL SELECT 'diffA', NEW.diffA
+        UNION ALL SELECT 'diffL', NEW.diffL
+        UNION ALL SELECT 'bpm', NEW.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_stats_update AFTER UPDATE OF folder, artist, genre, ln, diffN, diffH, diffA, diffL, bpm ON song BEGIN
+    INSERT INTO song_stats (folder, dimension, value, count)
+    SELECT OLD.folder, dimension, value, -1 FROM (
+        SELECT 'folder' AS dimension, OLD.folder AS value
+        UNION ALL SELECT 'artist', OLD.artist
+        UNION ALL SELECT 'genre', NULLIF(OLD.genre, '')
+        UNION ALL SELECT 'ln', OLD.ln
+        UNION ALL SELECT 'diffN', OLD.diffN
+        UNION ALL SELECT 'diffH', OLD.diffH
+        UNION ALL SELECT 'diffA', OLD.diffA
+        UNION ALL SELECT 'diffL', OLD.diffL
+        UNION ALL SELECT 'bpm', OLD.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(folder, ''), IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO song_stats_total (dimension, value, count)
+    SELECT dimension, value, -1 FROM (
+        SELECT 'folder' AS dimension, OLD.folder AS value
+        UNION ALL SELECT 'artist', OLD.artist
+        UNION ALL SELECT 'genre', NULLIF(OLD.genre, '')
+        UNION ALL SELECT 'ln', OLD.ln
+        UNION ALL SELECT 'diffN', OLD.diffN
+        UNION ALL SELECT 'diffH', OLD.diffH
+        UNION ALL SELECT 'diffA', OLD.diffA
+        UNION ALL SELECT 'diffL', OLD.diffL
+        UNION ALL SELECT 'bpm', OLD.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO song_stats (folder, dimension, value, count)
+    SELECT NEW.folder, dimension, value, 1 FROM (
+        SELECT 'folder' AS dimension, NEW.folder AS value
+        UNION ALL SELECT 'artist', NEW.artist
+        UNION ALL SELECT 'genre', NULLIF(NEW.genre, '')
+        UNION ALL SELECT 'ln', NEW.ln
+        UNION ALL SELECT 'diffN', NEW.diffN
+        UNION ALL SELECT 'diffH', NEW.diffH
+        UNION ALL SELECT 'diffA', NEW.diffA
+        UNION ALL SELECT 'diffL', NEW.diffL
+        UNION ALL SELECT 'bpm', NEW.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(folder, ''), IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO song_stats_total (dimension, value, count)
+    SELECT dimension, value, 1 FROM (
+        SELECT 'folder' AS dimension, NEW.folder AS value
+        UNION ALL SELECT 'artist', NEW.artist
+        UNION ALL SELECT 'genre', NULLIF(NEW.genre, '')
+        UNION ALL SELECT 'ln', NEW.ln
+        UNION ALL SELECT 'diffN', NEW.diffN
+        UNION ALL SELECT 'diffH', NEW.diffH
+        UNION ALL SELECT 'diffA', NEW.diffA
+        UNION ALL SELECT 'diffL', NEW.diffL
+        UNION ALL SELECT 'bpm', NEW.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    DELETE FROM song_stats WHERE count = 0;
+    DELETE FROM song_stats_total WHERE count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_stats_delete AFTER DELETE ON song BEGIN
+    INSERT INTO song_stats (folder, dimension, value, count)
+    SELECT OLD.folder, dimension, value, -1 FROM (
+        SELECT 'folder' AS dimension, OLD.folder AS value
+        UNION ALL SELECT 'artist', OLD.artist
+        UNION ALL SELECT 'genre', NULLIF(OLD.genre, '')
+        UNION ALL SELECT 'ln', OLD.ln
+        UNION ALL SELECT 'diffN', OLD.diffN
+        UNION ALL SELECT 'diffH', OLD.diffH
+        UNION ALL SELECT 'diffA', OLD.diffA
+        UNION ALL SELECT 'diffL', OLD.diffL
+        UNION ALL SELECT 'bpm', OLD.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(folder, ''), IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO song_stats_total (dimension, value, count)
+    SELECT dimension, value, -1 FROM (
+        SELECT 'folder' AS dimension, OLD.folder AS value
+        UNION ALL SELECT 'artist', OLD.artist
+        UNION ALL SELECT 'genre', NULLIF(OLD.genre, '')
+        UNION ALL SELECT 'ln', OLD.ln
+        UNION ALL SELECT 'diffN', OLD.diffN
+        UNION ALL SELECT 'diffH', OLD.diffH
+        UNION ALL SELECT 'diffA', OLD.diffA
+        UNION ALL SELECT 'diffL', OLD.diffL
+        UNION ALL SELECT 'bpm', OLD.bpm_min / 10 * 10
+    ) WHERE true
+    ON CONFLICT (dimension, IFNULL(value, '')) DO UPDATE SET count = count + excluded.count;
+    DELETE FROM song_stats WHERE count = 0;
+    DELETE FROM song_stats_total WHERE count = 0;
+END;
+
+DELETE FROM song_stats;
+
+INSERT INTO song_stats (folder, dimension, value, count)
+SELECT folder, 'folder', folder, COUNT(*) FROM song GROUP BY folder, folder
+UNION ALL SELECT folder, 'artist', artist, COUNT(*) FROM song GROUP BY folder, artist
+UNION ALL SELECT folder, 'genre', NULLIF(genre, ''), COUNT(*) FROM song GROUP BY folder, NULLIF(genre, '')
+UNION ALL SELECT folder, 'ln', ln, COUNT(*) FROM song GROUP BY folder, ln
+UNION ALL SELECT folder, 'diffN', diffN, COUNT(*) FROM song GROUP BY folder, diffN
+UNION ALL SELECT folder, 'diffH', diffH, COUNT(*) FROM song GROUP BY folder, diffH
+UNION ALL SELECT folder, 'diffA', diffA, COUNT(*) FROM song GROUP BY folder, diffA
+UNION ALL SELECT folder, 'diffL', diffL, COUNT(*) FROM song GROUP BY folder, diffL
+UNION ALL SELECT folder, 'bpm', bpm_min / 10 * 10, COUNT(*) FROM song GROUP BY folder, bpm_min / 10 * 10;
+
+DELETE FROM song_stats_total;
+
+INSERT INTO song_stats_total (dimension, value, count)
+SELECT 'folder', folder, COUNT(*) FROM song GROUP BY folder
+UNION ALL SELECT 'artist', artist, COUNT(*) FROM song GROUP BY artist
+UNION ALL SELECT 'genre', NULLIF(genre, ''), COUNT(*) FROM song GROUP BY NULLIF(genre, '')
+UNION ALL SELECT 'ln', ln, COUNT(*) FROM song GROUP BY ln
+UNION ALL SELECT 'diffN', diffN, COUNT(*) FROM song GROUP BY diffN
+UNION ALL SELECT 'diffH', diffH, COUNT(*) FROM song GROUP BY diffH
+UNION ALL SELECT 'diffA', diffA, COUNT(*) FROM song GROUP BY diffA
+UNION ALL SELECT 'diffL', diffL, COUNT(*) FROM song GROUP BY diffL
+UNION ALL SELECT 'bpm', bpm_min / 10 * 10, COUNT(*) FROM song GROUP BY bpm_min / 10 * 10;
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS import_checkpoint (
+    source TEXT PRIMARY KEY,
+    tbl TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    deferred TEXT NOT NULL,
+    started_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
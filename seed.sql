@@ -1,37 +1,3 @@
-DROP TABLE IF EXISTS folder;
-DROP TABLE IF EXISTS artist;
-DROP TABLE IF EXISTS song;
-
-CREATE TABLE folder (
-    number INTEGER PRIMARY KEY,
-    title TEXT NOT NULL,
-    theme TEXT,
-    slogan TEXT
-);
-
-CREATE TABLE artist (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    pseudonym TEXT
-);
-
-CREATE TABLE song (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
-    bpm TEXT,
-    length INTEGER,
-    genre TEXT,
-    artist INTEGER,
-    folder INTEGER,
-    ln BOOLEAN DEFAULT 0,
-    diffN INTEGER,
-    diffH INTEGER,
-    diffA INTEGER,
-    diffL INTEGER,
-    FOREIGN KEY (artist) REFERENCES artist(id) ON DELETE SET NULL,
-    FOREIGN KEY (folder) REFERENCES folder(number) ON DELETE CASCADE
-);
-
 INSERT INTO folder (number, title, theme, slogan) VALUES
 (1, 'HEROIC VERSE', 'Heroic', 'Be a Hero!'),
 (2, 'BISTROVER', 'Bistro', 'Bon Appétit!'),
@@ -57,15 +23,3 @@ INSERT INTO song (id, title, bpm, length, genre, artist, folder, ln, diffN, diff
 (8, 'Rising in the Sun', '158', 200, 'Pop Trance', 5, 3, 0, 5, 8, 11, 0),
 (9, 'Sakura Storm', '180', 190, 'Japanese Pop', 4, 4, 1, 6, 9, 12, 0),
 (10, 'Blue Rain', '140', 210, 'Drum & Bass', 5, 5, 0, 5, 8, 11, 0);
-
-INSERT INTO song_artist (song_id, artist_id) VALUES
-(1, 1),
-(2, 1),
-(3, 2),
-(4, 3),
-(5, 4),
-(6, 3),
-(7, 2),
-(8, 5),
-(9, 4),
-(10, 5);
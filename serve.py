@@ -0,0 +1,137 @@
+import argparse
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import app as api
+from migrate import latest_version, schema_version
+from transfer import pending_imports
+
+class RequestHandler(WSGIRequestHandler):
+    timeout = 5
+    access_log = False
+
+    def log_request(self, code='-', size='-'):
+        if self.access_log:
+            super().log_request(code, size)
+
+def check_schema(database):
+    if not os.path.exists(database):
+        sys.exit(f"{database} does not exist; run python init_db.py --database {database}")
+    connection = sqlite3.connect(database)
+    version = schema_version(connection)
+    unfinished = pending_imports(connection) if version >= latest_version() else []
+    connection.close()
+    if version < latest_version():
+        sys.exit(f"{database} is at schema version {version}, expected {latest_version()}; run python init_db.py --database {database}")
+    if unfinished:
+        sys.exit(f"Import of {unfinished[0]} did not finish; run python transfer.py --database {database} import to resume it")
+
+def run_worker(listener, args):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    api.warm_pools()
+    server = make_server(args.host, args.port, api.app, threaded=True, request_handler=RequestHandler, fd=listener.fileno())
+    server.daemon_threads = False
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+    api.close_pools()
+    return 0
+
+def spawn_worker(listener, args):
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = run_worker(listener, args)
+        finally:
+            os._exit(code)
+    return pid
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the music database API with pre-forked worker processes")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes; each runs its own write queue, so writes are only group-committed within a worker and workers contend for the SQLite write lock (use 1 for a single writer)")
+    parser.add_argument('--database', default=api.DATABASE)
+    parser.add_argument('--backlog', type=int, default=1024)
+    parser.add_argument('--keepalive', type=float, default=5.0, help="Seconds an idle connection is kept open")
+    parser.add_argument('--graceful-timeout', type=float, default=30.0, help="Seconds to let workers finish in-flight requests on shutdown")
+    parser.add_argument('--access-log', action='store_true')
+    parser.add_argument('--read-limit', type=int, default=api.app.config['ADMISSION_READ_LIMIT'], help="Concurrent read requests admitted per worker")
+    parser.add_argument('--read-queue', type=int, default=api.app.config['ADMISSION_READ_QUEUE'], help="Read requests allowed to wait for a slot before 503")
+    parser.add_argument('--write-limit', type=int, default=api.app.config['ADMISSION_WRITE_LIMIT'], help="Concurrent write requests admitted per worker")
+    parser.add_argument('--write-queue', type=int, default=api.app.config['ADMISSION_WRITE_QUEUE'], help="Write requests allowed to wait for a slot before 503")
+    parser.add_argument('--admission-timeout', type=float, default=api.app.config['ADMISSION_TIMEOUT'], help="Seconds a queued request waits for a slot before 503")
+    args = parser.parse_args(argv)
+
+    check_schema(args.database)
+    api.DATABASE = args.database
+    api.app.debug = False
+    api.app.config['ADMISSION_READ_LIMIT'] = args.read_limit
+    api.app.config['ADMISSION_READ_QUEUE'] = args.read_queue
+    api.app.config['ADMISSION_WRITE_LIMIT'] = args.write_limit
+    api.app.config['ADMISSION_WRITE_QUEUE'] = args.write_queue
+    api.app.config['ADMISSION_TIMEOUT'] = args.admission_timeout
+    RequestHandler.timeout = args.keepalive
+    RequestHandler.access_log = args.access_log
+
+    listener = socket.create_server((args.host, args.port), backlog=args.backlog)
+    listener.set_inheritable(True)
+    args.port = listener.getsockname()[1]
+
+    workers = {}
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        print(f"Stopping {len(workers)} workers", flush=True)
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        killer = threading.Timer(args.graceful_timeout, kill_workers)
+        killer.daemon = True
+        killer.start()
+
+    def kill_workers():
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(max(1, args.workers)):
+        workers[spawn_worker(listener, args)] = time.monotonic()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving on http://{args.host}:{args.port} with {len(workers)} workers", flush=True)
+    if len(workers) > 1:
+        print(f"Each of the {len(workers)} workers commits its own writes; run with --workers 1 to keep a single writer", flush=True)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping.is_set():
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting", flush=True)
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        workers[spawn_worker(listener, args)] = time.monotonic()
+    listener.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def numeric(column):
+    return f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN {column} END"
+
+
+FEATURES = {
+    'bpm': (f'({numeric("bpm_min")} + {numeric("bpm_max")}) / 2.0', 1.0),
+    'length': (numeric('length'), 1.0),
+    'ln': (numeric('ln'), 0.5),
+    'diffN': (numeric('diffN'), 1.0),
+    'diffH': (numeric('diffH'), 1.0),
+    'diffA': (numeric('diffA'), 1.0),
+    'diffL': (numeric('diffL'), 1.0),
+}
+
+
+def feature_columns():
+    return ', '.join(f'{expression} AS "{name}"' for name, (expression, _) in FEATURES.items())
+
+
+class SimilarityIndex:
+    def __init__(self, table, features, block_size=65536, refit_ratio=0.1):
+        self.table = table
+        self.features = list(features)
+        self.weights = numpy.array([weight for _, weight in features.values()])
+        self.block_size = block_size
+        self.refit_ratio = refit_ratio
+        self.seq = None
+        self.lock = threading.Lock()
+        self._positions = {}
+        self._count = 0
+        self._changes = 0
+        self._keys = numpy.empty(0, dtype=numpy.int64)
+        self._raw = numpy.empty((0, len(self.features)))
+        self._vectors = numpy.empty((0, len(self.features)), dtype=numpy.float32)
+        self._norms = numpy.empty(0, dtype=numpy.float32)
+        self._mean = numpy.zeros(len(self.features))
+        self._scale = numpy.ones(len(self.features))
+
+    def row_values(self, row):
+        return [numpy.nan if row[name] is None else row[name] for name in self.features]
+
+    def load(self, rows, seq):
+        keys = []
+        values = []
+        for table, key, row in rows:
+            if table == self.table:
+                keys.append(key)
+                values.append(self.row_values(row))
+        self._count = len(keys)
+        self._keys = numpy.array(keys, dtype=numpy.int64)
+        self._raw = numpy.array(values, dtype=numpy.float64).reshape(self._count, len(self.features))
+        self._positions = {key: position for position, key in enumerate(keys)}
+        self._fit()
+        self.seq = seq
+
+    def _fit(self):
+        raw = self._raw[:self._count]
+        if self._count:
+            counts = numpy.maximum(numpy.isfinite(raw).sum(axis=0), 1)
+            self._mean = numpy.nansum(raw, axis=0) / counts
+            std = numpy.sqrt(numpy.nansum((raw - self._mean) ** 2, axis=0) / counts)
+            self._scale = self.weights / numpy.where(std > 0, std, 1.0)
+        self._vectors = numpy.zeros(self._raw.shape, dtype=numpy.float32)
+        self._norms = numpy.zeros(len(self._raw), dtype=numpy.float32)
+        self._vectors[:self._count] = self._normalize(raw)
+        self._norms[:self._count] = numpy.einsum('ij,ij->i', self._vectors[:self._count], self._vectors[:self._count])
+        self._changes = 0
+
+    def _normalize(self, raw):
+        return numpy.nan_to_num((raw - self._mean) * self._scale)
+
+    def _grow(self):
+        capacity = max(16, len(self._raw) + len(self._raw) // 4)
+        for name in ('_keys', '_raw', '_vectors', '_norms'):
+            array = getattr(self, name)
+            grown = numpy.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self._count] = array[:self._count]
+            setattr(self, name, grown)
+
+    def update(self, table, key, row):
+        if table != self.table:
+            return
+        position = self._positions.get(key)
+        if row is None:
+            if position is not None:
+                self._remove(key, position)
+            return
+        if position is None:
+            if self._count == len(self._raw):
+                self._grow()
+            position = self._count
+            self._count += 1
+            self._positions[key] = position
+            self._keys[position] = key
+        self._raw[position] = self.row_values(row)
+        self._vectors[position] = self._normalize(self._raw[position])
+        self._norms[position] = self._vectors[position] @ self._vectors[position]
+        self._changes += 1
+
+    def _remove(self, key, position):
+        last = self._count - 1
+        del self._positions[key]
+        if position != last:
+            moved = int(self._keys[last])
+            for array in (self._keys, self._raw, self._vectors, self._norms):
+                array[position] = array[last]
+            self._positions[moved] = position
+        self._count = last
+        self._changes += 1
+
+    def search(self, key, k):
+        position = self._positions.get(key)
+        if position is None:
+            return None
+        if self._changes > self.refit_ratio * self._count:
+            self._fit()
+        query = self._vectors[position]
+        scores = []
+        keys = []
+        for start in range(0, self._count, self.block_size):
+            stop = min(start + self.block_size, self._count)
+            block = self._norms[start:stop] - 2 * (self._vectors[start:stop] @ query)
+            if start <= position < stop:
+                block[position - start] = numpy.inf
+            if len(block) > k:
+                top = numpy.argpartition(block, k)[:k]
+                block = block[top]
+                top += start
+            else:
+                top = numpy.arange(start, stop)
+            scores.append(block)
+            keys.append(self._keys[top])
+        if not scores:
+            return []
+        scores = numpy.concatenate(scores)
+        keys = numpy.concatenate(keys)
+        order = numpy.argsort(scores, kind='stable')[:k]
+        distances = numpy.sqrt(numpy.maximum(scores[order] + query @ query, 0))
+        return [(int(keys[i]), float(distance)) for i, distance in zip(order, distances) if numpy.isfinite(distance)]
+
+    def stats(self):
+        return {
+            'seq': self.seq,
+            'rows': self._count,
+            'capacity': len(self._raw),
+            'changes_since_fit': self._changes,
+        }
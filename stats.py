@@ -0,0 +1,42 @@
+DIMENSIONS = {
+    'folder': 'folder',
+    'artist': 'artist',
+    'genre': "NULLIF(genre, '')",
+    'ln': 'ln',
+    'diffN': 'diffN',
+    'diffH': 'diffH',
+    'diffA': 'diffA',
+    'diffL': 'diffL',
+    'bpm': 'bpm_min / 10 * 10',
+}
+
+
+def folder_counts():
+    return ' UNION ALL '.join(
+        f"SELECT folder, '{name}', {expression}, COUNT(*) FROM song GROUP BY folder, {expression}"
+        for name, expression in DIMENSIONS.items()
+    )
+
+
+def total_counts():
+    return ' UNION ALL '.join(
+        f"SELECT '{name}', {expression}, COUNT(*) FROM song GROUP BY {expression}"
+        for name, expression in DIMENSIONS.items()
+    )
+
+
+def rebuild_stats(conn):
+    conn.execute("DELETE FROM song_stats")
+    conn.execute("DELETE FROM song_stats_total")
+    rows = conn.execute(f"INSERT INTO song_stats (folder, dimension, value, count) {folder_counts()}").rowcount
+    return rows + conn.execute(f"INSERT INTO song_stats_total (dimension, value, count) {total_counts()}").rowcount
+
+
+def check_stats(conn):
+    drift = 0
+    for query, table in ((folder_counts(), "SELECT folder, dimension, value, count FROM song_stats"),
+                         (total_counts(), "SELECT dimension, value, count FROM song_stats_total")):
+        expected = {tuple(row) for row in conn.execute(query)}
+        actual = {tuple(row) for row in conn.execute(table)}
+        drift += len(expected ^ actual)
+    return drift
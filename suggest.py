@@ -0,0 +1,120 @@
+import bisect
+import threading
+
+
+def normalize(value):
+    return value.casefold()
+
+
+def word_keys(value):
+    key = normalize(value)
+    return [key[position:] for position in range(1, len(key)) if key[position].isalnum() and not key[position - 1].isalnum()]
+
+
+def remove_entry(entries, entry):
+    position = bisect.bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def scan(entries, prefix, limit, results):
+    position = bisect.bisect_left(entries, (prefix,))
+    while position < len(entries) and len(results) < limit:
+        key, value = entries[position]
+        if not key.startswith(prefix):
+            break
+        if value not in results:
+            results.append(value)
+        position += 1
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._values = []
+        self._words = []
+        self._counts = {}
+
+    def add(self, value):
+        count = self._counts.get(value, 0)
+        self._counts[value] = count + 1
+        if count == 0:
+            bisect.insort(self._values, (normalize(value), value))
+            for key in word_keys(value):
+                bisect.insort(self._words, (key, value))
+
+    def remove(self, value):
+        count = self._counts.get(value, 0)
+        if count > 1:
+            self._counts[value] = count - 1
+            return
+        self._counts.pop(value, None)
+        remove_entry(self._values, (normalize(value), value))
+        for key in word_keys(value):
+            remove_entry(self._words, (key, value))
+
+    def load(self, values):
+        self._counts = {}
+        for value in values:
+            self._counts[value] = self._counts.get(value, 0) + 1
+        self._values = sorted((normalize(value), value) for value in self._counts)
+        self._words = sorted((key, value) for value in self._counts for key in word_keys(value))
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        results = []
+        scan(self._values, prefix, limit, results)
+        scan(self._words, prefix, limit, results)
+        return results
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class SuggestIndex:
+    def __init__(self, fields):
+        self.fields = fields
+        self.indexes = {name: PrefixIndex() for name in fields}
+        self.seq = None
+        self.lock = threading.Lock()
+        self._rows = {}
+
+    def row_values(self, table, row):
+        values = {}
+        if row is not None:
+            for name, (source, column) in self.fields.items():
+                if source == table and row[column]:
+                    values[name] = row[column]
+        return values
+
+    def load(self, rows, seq):
+        self._rows = {}
+        columns = {name: [] for name in self.fields}
+        for table, key, row in rows:
+            values = self.row_values(table, row)
+            if values:
+                self._rows[(table, key)] = values
+            for name, value in values.items():
+                columns[name].append(value)
+        for name, values in columns.items():
+            self.indexes[name].load(values)
+        self.seq = seq
+
+    def update(self, table, key, row):
+        old = self._rows.pop((table, key), {})
+        new = self.row_values(table, row)
+        for name, value in old.items():
+            self.indexes[name].remove(value)
+        for name, value in new.items():
+            self.indexes[name].add(value)
+        if new:
+            self._rows[(table, key)] = new
+
+    def search(self, name, prefix, limit):
+        return self.indexes[name].search(prefix, limit)
+
+    def stats(self):
+        return {
+            'seq': self.seq,
+            'rows': len(self._rows),
+            'values': {name: len(index) for name, index in self.indexes.items()},
+        }
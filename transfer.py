@@ -0,0 +1,284 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from migrate import latest_version, schema_version
+from stats import rebuild_stats
+
+TABLES = {
+    'folder': ('number', ('number', 'title', 'theme', 'slogan')),
+    'artist': ('id', ('id', 'name', 'pseudonym')),
+    'song': ('id', ('id', 'title', 'bpm', 'length', 'genre', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL')),
+}
+
+INTEGER_COLUMNS = {'number', 'id', 'length', 'artist', 'folder', 'ln', 'diffN', 'diffH', 'diffA', 'diffL'}
+
+DEFAULT_VALUES = {
+    'song': {'ln': 0},
+}
+
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+FORMATS = ('ndjson', 'csv')
+
+def rebuild_fts(conn, table):
+    conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+
+def bump_version(conn, table):
+    conn.execute("UPDATE table_version SET version = version + 1, modified = strftime('%s', 'now') WHERE name = ?", (table,))
+
+def rebuild_table_stats(conn, table):
+    rebuild_stats(conn)
+
+REBUILDS = {
+    'version': bump_version,
+    'fts': rebuild_fts,
+    'stats': rebuild_table_stats,
+}
+
+def guess_format(path):
+    return 'csv' if path and path.lower().endswith('.csv') else 'ndjson'
+
+def export_query(table):
+    key, columns = TABLES[table]
+    return f"SELECT {', '.join(columns)} FROM {table} ORDER BY {key}"
+
+def export_chunks(conn, table, format, chunk_size=5000):
+    cursor = conn.execute(export_query(table))
+    columns = [column[0] for column in cursor.description]
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield 0, buffer.getvalue()
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        if format == 'csv':
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield len(rows), buffer.getvalue()
+        else:
+            yield len(rows), ''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+
+def read_records(stream, format):
+    if format == 'csv':
+        for record in csv.DictReader(stream):
+            yield {column: value if value != '' else None for column, value in record.items()}
+        return
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Line {number} is not valid JSON")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {number} is not a JSON object")
+            yield record
+
+def fits_integer(value):
+    return SQLITE_INT_MIN <= value <= SQLITE_INT_MAX
+
+def validate_value(column, value):
+    if value is None:
+        return None
+    if column in INTEGER_COLUMNS:
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"{column} must be an integer")
+        if not isinstance(value, int):
+            raise ValueError(f"{column} must be an integer")
+        if not fits_integer(value):
+            raise ValueError(f"{column} is out of range")
+    elif column == 'bpm' and isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    elif not isinstance(value, str):
+        raise ValueError(f"{column} must be a string")
+    return value
+
+def record_values(table, record, number):
+    _, columns = TABLES[table]
+    if None in record:
+        raise ValueError(f"Record {number}: too many fields")
+    unknown = set(record) - set(columns)
+    if unknown:
+        raise ValueError(f"Record {number}: unknown column {', '.join(sorted(unknown))}")
+    defaults = DEFAULT_VALUES.get(table, {})
+    try:
+        return [validate_value(column, record.get(column, defaults.get(column))) for column in columns]
+    except ValueError as error:
+        raise ValueError(f"Record {number}: {error}")
+
+def upsert_query(table):
+    key, columns = TABLES[table]
+    updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column != key)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) ON CONFLICT ({key}) DO UPDATE SET {updates}"
+
+def validate_chunks(table, records, start=0, chunk_size=5000):
+    number = start
+    while True:
+        chunk = []
+        for record in itertools.islice(records, chunk_size):
+            number += 1
+            chunk.append(record_values(table, record, number))
+        if not chunk:
+            return
+        yield number - len(chunk) + 1, chunk
+
+def insert_chunks(conn, table, chunks):
+    query = upsert_query(table)
+    for first, chunk in chunks:
+        try:
+            conn.executemany(query, chunk)
+        except sqlite3.IntegrityError as error:
+            raise ValueError(f"Records {first}-{first + len(chunk) - 1}: {error}")
+        yield len(chunk)
+
+def import_chunks(conn, table, records, start=0, chunk_size=5000):
+    return insert_chunks(conn, table, validate_chunks(table, records, start, chunk_size))
+
+def trigger_kind(table, name):
+    return next((kind for kind in REBUILDS if name.startswith(f"{table}_{kind}_")), None)
+
+def defer_objects(conn, table):
+    deferred = [
+        (kind, name, sql) for kind, name, sql in conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL ORDER BY type, name",
+            (table,)
+        )
+        if (kind == 'index' and not sql.upper().startswith('CREATE UNIQUE')) or (kind == 'trigger' and trigger_kind(table, name))
+    ]
+    for kind, name, _ in deferred:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    return deferred
+
+def restore_objects(conn, table, deferred):
+    for _, _, sql in deferred:
+        conn.execute(sql)
+    kinds = {trigger_kind(table, name) for kind, name, _ in deferred if kind == 'trigger'}
+    for kind, rebuild in REBUILDS.items():
+        if kind in kinds:
+            rebuild(conn, table)
+
+def load_chunks(conn, table, chunks, defer=True):
+    deferred = defer_objects(conn, table) if defer else []
+    rows = sum(insert_chunks(conn, table, chunks))
+    restore_objects(conn, table, deferred)
+    return rows
+
+def pending_imports(conn):
+    return [row[0] for row in conn.execute("SELECT source FROM import_checkpoint ORDER BY started_at")]
+
+def report(table, rows, seconds, file=sys.stderr):
+    print(f"{table}: {rows} rows in {seconds:.1f}s ({rows / seconds if seconds else 0:.0f} rows/s)", file=file, flush=True)
+
+def run_export(conn, table, path, format, chunk_size):
+    start = time.perf_counter()
+    rows = 0
+    output = open(path, 'w', newline='', encoding='utf-8') if path else sys.stdout
+    try:
+        for count, chunk in export_chunks(conn, table, format, chunk_size):
+            output.write(chunk)
+            rows += count
+    finally:
+        if path:
+            output.close()
+    report(table, rows, time.perf_counter() - start)
+
+def run_import(conn, table, path, format, chunk_size, commit_every, defer):
+    source = os.path.abspath(path)
+    conn.execute("BEGIN IMMEDIATE")
+    checkpoint = conn.execute("SELECT tbl, position, deferred FROM import_checkpoint WHERE source = ?", (source,)).fetchone()
+    if checkpoint is not None:
+        if checkpoint[0] != table:
+            conn.execute("ROLLBACK")
+            sys.exit(f"{path} has an unfinished import into {checkpoint[0]}; resume it with that table")
+        position, deferred = checkpoint[1], [tuple(item) for item in json.loads(checkpoint[2])]
+        print(f"Resuming {path} at record {position}", file=sys.stderr)
+    else:
+        position = 0
+        deferred = defer_objects(conn, table) if defer else []
+        conn.execute("INSERT INTO import_checkpoint (source, tbl, deferred) VALUES (?, ?, ?)", (source, table, json.dumps(deferred)))
+    conn.execute("COMMIT")
+
+    start = time.perf_counter()
+    rows = 0
+    pending = 0
+    with open(path, newline='', encoding='utf-8') as f:
+        records = itertools.islice(read_records(f, format), position, None)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for count in import_chunks(conn, table, records, position, chunk_size):
+                rows += count
+                pending += count
+                if pending >= commit_every:
+                    conn.execute("UPDATE import_checkpoint SET position = ?, updated_at = datetime('now') WHERE source = ?", (position + rows, source))
+                    conn.execute("COMMIT")
+                    report(table, rows, time.perf_counter() - start)
+                    pending = 0
+                    conn.execute("BEGIN IMMEDIATE")
+            restore_objects(conn, table, deferred)
+            conn.execute("DELETE FROM import_checkpoint WHERE source = ?", (source,))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    report(table, rows, time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream tables of the music database to and from NDJSON or CSV files")
+    parser.add_argument('--database', default='database.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="Write a table to a file or stdout")
+    export.add_argument('table', choices=TABLES)
+    export.add_argument('-o', '--output', help="Output file; stdout when omitted")
+    export.add_argument('--format', choices=FORMATS, help="Defaults to csv for .csv files, ndjson otherwise")
+    export.add_argument('--chunk-size', type=int, default=5000)
+
+    load = commands.add_parser('import', help="Insert or update rows of a table from a file, resuming an interrupted import of the same file")
+    load.add_argument('table', choices=TABLES)
+    load.add_argument('input')
+    load.add_argument('--format', choices=FORMATS, help="Defaults to csv for .csv files, ndjson otherwise")
+    load.add_argument('--chunk-size', type=int, default=5000, help="Rows per executemany call")
+    load.add_argument('--commit-every', type=int, default=100000, help="Rows per transaction and checkpoint")
+    load.add_argument('--no-defer', action='store_true', help="Keep secondary indexes and triggers live during the import")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        sys.exit(f"{args.database} does not exist; run python init_db.py --database {args.database}")
+    connection = sqlite3.connect(args.database, isolation_level=None)
+    if schema_version(connection) < latest_version():
+        sys.exit(f"{args.database} is at schema version {schema_version(connection)}, expected {latest_version()}; run python init_db.py --database {args.database}")
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+
+    try:
+        if args.command == 'export':
+            run_export(connection, args.table, args.output, args.format or guess_format(args.output), args.chunk_size)
+        else:
+            try:
+                run_import(connection, args.table, args.input, args.format or guess_format(args.input), args.chunk_size, args.commit_every, not args.no_defer)
+            except ValueError as error:
+                sys.exit(f"Import failed, nothing after the last checkpoint was written: {error}")
+    finally:
+        connection.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
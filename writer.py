@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class Rollback(Exception):
+    def __init__(self, result=None):
+        super().__init__(result)
+        self.result = result
+
+
+class WriteQueue:
+    def __init__(self, pool, max_batch=64, max_latency=0.002):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._jobs = 0
+        self._failed = 0
+        self._batches = 0
+        self._batch_max = 0
+        self._commit_total = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, func):
+        future = Future()
+        self.start()
+        self._queue.put((func, future))
+        return future
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            stop = False
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        batch = [(func, future) for func, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        results = []
+        try:
+            conn = self.pool.acquire()
+        except Exception as error:
+            self._finish([(future, error, None) for _, future in batch], start)
+            return
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for func, future in batch:
+                conn.execute("SAVEPOINT job")
+                try:
+                    results.append((future, None, func(conn)))
+                except Rollback as rollback:
+                    conn.execute("ROLLBACK TO job")
+                    results.append((future, None, rollback.result))
+                except Exception as error:
+                    conn.execute("ROLLBACK TO job")
+                    results.append((future, error, None))
+                conn.execute("RELEASE job")
+            conn.commit()
+        except Exception as error:
+            if conn.in_transaction:
+                conn.rollback()
+            results = [(future, error, None) for _, future in batch]
+        finally:
+            conn.close()
+        self._finish(results, start)
+
+    def _finish(self, results, start):
+        with self._lock:
+            self._batches += 1
+            self._jobs += len(results)
+            self._failed += sum(1 for _, error, _ in results if error is not None)
+            self._batch_max = max(self._batch_max, len(results))
+            self._commit_total += time.perf_counter() - start
+        for future, error, result in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch': self.max_batch,
+                'max_latency_ms': self.max_latency * 1000,
+                'queued': self._queue.qsize(),
+                'jobs': self._jobs,
+                'failed': self._failed,
+                'batches': self._batches,
+                'batch_avg': round(self._jobs / self._batches, 3) if self._batches else 0.0,
+                'batch_max': self._batch_max,
+                'commit_avg_ms': round(self._commit_total * 1000 / self._batches, 3) if self._batches else 0.0,
+            }